@@ -0,0 +1,90 @@
+"""Export throughput of `WwiseController` against the offline WAAPI stand-in.
+
+Each size runs against a fresh stand-in project holding that many segments, into
+one of which that many cues are exported, then cleared.
+
+Run with `python -m bench.export_throughput --sizes 1000 10000 100000`.
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import polars as pl
+
+from bench.waapi_standin import running
+from wet.components import wwise_client
+from wet.components.wwise_client import WwiseController
+
+
+def _timed(results: dict[str, float], name: str, fn: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    fn()
+    results[name] = time.perf_counter() - start
+
+
+def _bench_size(size: int, latency_ms: float, per_cue_limit: int) -> dict[str, float]:
+    results: dict[str, float] = {}
+    cues = pl.DataFrame(
+        {"name": [f"Cue_{i}" for i in range(size)], "time_ms": range(size)}
+    )
+    wwise = WwiseController(timeout=60.0)
+    with running(size, latency_ms) as url:
+        wwise_client.configure_connection(url)
+        wwise.connect()
+
+        segments: list[dict[str, str]] = []
+        _timed(
+            results,
+            "get_music_segments",
+            lambda: segments.extend(wwise.get_music_segments()),
+        )
+        segment_id = segments[0]["id"]
+
+        # One call per cue is what the slow path costs; cap it for large sizes.
+        per_cue = cues.head(per_cue_limit)
+
+        def create_one_by_one() -> None:
+            for name, time_ms in per_cue.iter_rows():
+                wwise.create_cue(name, segment_id, time_ms)
+
+        _timed(results, "create_cue", create_one_by_one)
+        results["create_cue"] *= size / max(per_cue.height, 1)
+        wwise.clear_custom_cues(segment_id)
+        _timed(results, "create_cues", lambda: wwise.create_cues(segment_id, cues))
+        _timed(
+            results, "clear_custom_cues", lambda: wwise.clear_custom_cues(segment_id)
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cue export to Wwise.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--per-cue-limit",
+        type=int,
+        default=10000,
+        help="Cues exported one by one, extrapolated to the full size.",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the results here.")
+    args = parser.parse_args()
+
+    report: dict[str, dict[str, float]] = {}
+    for size in args.sizes:
+        results = _bench_size(size, args.latency_ms, args.per_cue_limit)
+        report[str(size)] = results
+        for name, seconds in results.items():
+            rate = size / seconds if seconds else float("inf")
+            print(f"{size:>8} {name:<20} {seconds:>9.3f} s {rate:>12.0f} /s")
+
+    wwise_client.shutdown_connection()
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Timings of the tap, calibration and export hot paths, on synthetic data.
+
+Data comes from seeded generators, so runs can be compared across commits:
+`python -m bench.hot_paths --json before.json` on one commit, then
+`python -m bench.hot_paths --compare before.json` on another.
+
+Widgets run on the offscreen Qt platform unless `QT_QPA_PLATFORM` says otherwise.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess as sp
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from wet.calibration import calibrate_taps, make_cue_frame
+from wet.takes import DEFAULT_TOLERANCE_MS, merge_takes
+from wet.tap_buffer import TapBuffer
+from wet.tap_io import SCHEMA, write_taps
+from wet.tempo import TempoMap
+
+# Case -> size -> metric -> value. Sizes are strings to survive JSON.
+type _Report = dict[str, dict[str, dict[str, float]]]
+
+_TRACKS = ("J", "K", "L")
+_TEMPO_MAP = TempoMap.constant(128.0, 250.0)
+_LOAD_FORMATS = (".csv", ".parquet", ".arrow")
+
+
+def make_raw_taps(rows: int, seed: int = 0) -> pl.DataFrame:
+    """Raw taps about 120 ms apart over the tracks, a fifth of them never lifted."""
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.exponential(120.0, rows))
+    held = rng.uniform(30.0, 200.0, rows)
+    ends = np.where(rng.random(rows) < 0.2, 0.0, starts + held)
+    return pl.DataFrame(
+        {
+            "track": np.asarray(_TRACKS)[rng.integers(0, len(_TRACKS), rows)],
+            "start": starts,
+            "end": ends,
+        },
+        schema=SCHEMA,
+    )
+
+
+def _time(fn: Callable[[], object], repeats: int) -> dict[str, float]:
+    times: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times)}
+
+
+def _bench_frames(sizes: list[int], repeats: int, tmp: Path) -> _Report:
+    report: _Report = {}
+
+    def record(case: str, size: int, fn: Callable[[], object]) -> None:
+        report.setdefault(case, {})[str(size)] = _time(fn, repeats)
+        _print_result(case, size, report[case][str(size)])
+
+    from wet.components.calibrator import RawTapPathConfigurator
+
+    configurator = RawTapPathConfigurator()
+    for size in sizes:
+        raw = make_raw_taps(size)
+        calibrated = calibrate_taps(raw, _TEMPO_MAP)
+        record("calibrate_taps", size, partial(calibrate_taps, raw, _TEMPO_MAP))
+        record("make_cue_frame", size, partial(make_cue_frame, calibrated))
+
+        # As the tracks container exports: its buffer to a frame, then to a file.
+        buffer = TapBuffer(list(_TRACKS))
+        buffer.extend(raw)
+        csv_path = tmp / f"export.{size}.csv"
+        record(
+            "export_csv",
+            size,
+            lambda buffer=buffer, path=csv_path: write_taps(buffer.to_frame(), path),
+        )
+
+        for suffix in _LOAD_FORMATS:
+            path = tmp / f"raw_taps.{size}{suffix}"
+            write_taps(raw, path)
+            record(
+                f"load_raw_taps{suffix}",
+                size,
+                lambda path=path: configurator.load_raw_taps(str(path)),
+            )
+            path.unlink()
+        csv_path.unlink()
+    return report
+
+
+def _bench_merge(takes: int, rows: int, repeats: int) -> _Report:
+    """Merge takes of the same taps, each jittered as a human would."""
+    raw = make_raw_taps(rows)
+    rng = np.random.default_rng(1)
+    frames = [
+        raw.with_columns(start=pl.col("start") + rng.normal(0.0, 8.0, rows))
+        for _ in range(takes)
+    ]
+    result = _time(partial(merge_takes, frames, DEFAULT_TOLERANCE_MS), repeats)
+    _print_result("merge_takes", takes * rows, result)
+    return {"merge_takes": {str(takes * rows): result}}
+
+
+def _bench_taps(count: int, repeats: int, tmp: Path) -> _Report:
+    """Press and lift keys back to back, as fast as the container takes them."""
+    from PySide6.QtCore import Qt
+
+    from wet.components.tracks import TapTracksContainer
+
+    keys = (Qt.Key.Key_J, Qt.Key.Key_K, Qt.Key.Key_L)
+    # The container journals under the working directory.
+    with contextlib.chdir(tmp):
+        tracks = TapTracksContainer()
+        latencies: list[int] = []
+        totals: list[float] = []
+        timestamp = 0.0
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for i in range(count):
+                timestamp += 5.0
+                before = time.perf_counter_ns()
+                tracks.tap(keys[i // 2 % 3], timestamp, is_lift=bool(i % 2))
+                latencies.append(time.perf_counter_ns() - before)
+            totals.append((time.perf_counter_ns() - start) / 1e9)
+        tracks.close_journal()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) / 1000
+    result = {
+        "min_s": min(totals),
+        "median_s": statistics.median(totals),
+        "p50_us": float(p50),
+        "p99_us": float(p99),
+        "max_us": max(latencies) / 1000,
+    }
+    _print_result("tap", count, result)
+    print(f"{'':<24}{'':>10}   p50 {p50:.1f} us, p99 {p99:.1f} us per tap")
+    return {"tap": {str(count): result}}
+
+
+def _print_result(case: str, size: int, result: dict[str, float]) -> None:
+    seconds = result["min_s"]
+    rate = size / seconds if seconds else float("inf")
+    print(f"{case:<24}{size:>10} {seconds:>9.4f} s {rate:>14.0f} rows/s")
+
+
+def _environment() -> dict[str, str]:
+    try:
+        commit = sp.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, sp.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "numpy": np.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def _compare(report: _Report, baseline_path: Path) -> None:
+    """Print the time of each case relative to a baseline run."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nAgainst {baseline_path} ({baseline['environment']['commit']}):")
+    for case, sizes in report.items():
+        for size, result in sizes.items():
+            if (before := baseline["results"].get(case, {}).get(size)) is None:
+                continue
+            ratio = result["min_s"] / before["min_s"]
+            print(f"{case:<24}{size:>10} {ratio:>8.2f}x time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the tapper's hot paths.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument(
+        "--taps", type=int, default=100_000, help="Taps per repeat for `tap`."
+    )
+    parser.add_argument(
+        "--takes",
+        type=int,
+        nargs=2,
+        default=[24, 100_000],
+        metavar=("TAKES", "ROWS"),
+        help="Takes of so many rows each for `merge_takes`.",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="Also write the results here.")
+    parser.add_argument("--compare", type=Path, help="A JSON result to compare to.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    _app = QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        report = _bench_taps(args.taps, args.repeats, Path(tmp))
+        report |= _bench_frames(args.sizes, args.repeats, Path(tmp))
+    takes, rows = args.takes
+    report |= _bench_merge(takes, rows, args.repeats)
+
+    if args.json:
+        output = {"environment": _environment(), "results": report}
+        args.json.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    if args.compare:
+        _compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""An offline stand-in for the Wwise Authoring API.
+
+It speaks just enough WAMP over WebSocket for `waapi-client`, and implements the
+procedures the tapper uses against an in-memory object tree. Every reply can be
+delayed to emulate a real authoring instance.
+
+Run standalone with `python -m bench.waapi_standin --port 8080`.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import subprocess as sp
+import sys
+import uuid
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, cast, override
+
+from autobahn.asyncio.websocket import (  # type: ignore[import]
+    WebSocketServerFactory,
+    WebSocketServerProtocol,
+)
+
+# WAMP message codes.
+_HELLO, _WELCOME, _GOODBYE, _ERROR = 1, 2, 6, 8
+_SUBSCRIBE, _SUBSCRIBED, _UNSUBSCRIBE, _UNSUBSCRIBED, _EVENT = 32, 33, 34, 35, 36
+_CALL, _RESULT = 48, 50
+
+_REPO_DIR = Path(__file__).parent.parent
+_MUSIC_ROOT = "\\Interactive Music Hierarchy"
+
+_WAQL = re.compile(
+    r'from\s+(?:type\s+(?P<type>\w+)|object\s+"(?P<object>[^"]+)")'
+    r"(?:\s+select\s+(?P<select>descendants|children))?"
+    r"(?:\s+where\s+(?P<where>.+))?",
+    re.IGNORECASE,
+)
+_CONDITION = re.compile(r'@?(\w+)\s*(=|!=|<=|>=|<|>)\s*("[^"]*"|[-\d.]+)')
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    ">": lambda a, b: a is not None and a > b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">=": lambda a, b: a is not None and a >= b,
+}
+
+
+class WaapiError(Exception):
+    def __init__(self, message: str, uri: str) -> None:
+        super().__init__(message)
+        self.uri = uri
+
+
+@dataclass
+class WwiseObject:
+    id: str
+    name: str
+    type: str
+    parent: "WwiseObject | None"
+    properties: dict[str, Any] = field(default_factory=dict[str, Any])
+    children: list["WwiseObject"] = field(default_factory=list["WwiseObject"])
+
+    @property
+    def path(self) -> str:
+        if self.parent is None:
+            return f"\\{self.name}"
+        return f"{self.parent.path}\\{self.name}"
+
+    def get(self, key: str) -> Any:
+        key = key.removeprefix("@")
+        if key in ("id", "name", "type", "path"):
+            return getattr(self, key)
+        return self.properties.get(key)
+
+    def descendants(self) -> list["WwiseObject"]:
+        result: list[WwiseObject] = []
+        stack = list(reversed(self.children))
+        while stack:
+            obj = stack.pop()
+            result.append(obj)
+            stack.extend(reversed(obj.children))
+        return result
+
+
+type Publisher = Callable[[str, dict[str, Any]], None]
+
+
+class StandInWwise:
+    """An in-memory Wwise project answering WAAPI procedures."""
+
+    def __init__(self, segment_count: int = 1) -> None:
+        self._objects: dict[str, WwiseObject] = {}
+        self._root = WwiseObject(_new_id(), _MUSIC_ROOT[1:], "Folder", None)
+        self._objects[self._root.id] = self._root
+        self.work_unit = self._add("Default Work Unit", "WorkUnit", self._root)
+        for index in range(segment_count):
+            self._add(f"Segment_{index}", "MusicSegment", self.work_unit)
+
+        self.call_counts: dict[str, int] = {}
+        self.save_count = 0
+        self.publish: Publisher = lambda _topic, _event: None
+        self._procedures: dict[str, Callable[[dict[str, Any], dict[str, Any]], Any]] = {
+            "ak.wwise.core.getInfo": lambda _args, _opts: {"version": {"major": 0}},
+            "ak.wwise.core.object.get": self._get,
+            "ak.wwise.core.object.create": self._create,
+            "ak.wwise.core.object.delete": self._delete,
+            "ak.wwise.core.object.set": self._set,
+            "ak.wwise.core.project.save": self._save,
+            "ak.wwise.core.undo.beginGroup": lambda _args, _opts: {},
+            "ak.wwise.core.undo.endGroup": lambda _args, _opts: {},
+        }
+
+    def segments(self) -> list[WwiseObject]:
+        return [obj for obj in self._objects.values() if obj.type == "MusicSegment"]
+
+    def call(self, uri: str, args: dict[str, Any], options: dict[str, Any]) -> Any:
+        if (procedure := self._procedures.get(uri)) is None:
+            msg = f"Unknown procedure {uri}"
+            raise WaapiError(msg, "ak.wwise.invalid_procedure")
+        self.call_counts[uri] = self.call_counts.get(uri, 0) + 1
+        return procedure(args, options)
+
+    def _add(
+        self,
+        name: str,
+        type_: str,
+        parent: WwiseObject,
+        properties: dict[str, Any] | None = None,
+    ) -> WwiseObject:
+        obj = WwiseObject(_new_id(), name, type_, parent, properties or {})
+        parent.children.append(obj)
+        self._objects[obj.id] = obj
+        return obj
+
+    def _resolve(self, ref: str) -> WwiseObject:
+        if obj := self._objects.get(ref):
+            return obj
+        for obj in self._objects.values():
+            if obj.path == ref:
+                return obj
+        msg = f"Object {ref} not found"
+        raise WaapiError(msg, "ak.wwise.locate_error")
+
+    def _get(self, args: dict[str, Any], options: dict[str, Any]) -> Any:
+        if (match := _WAQL.fullmatch(args.get("waql", "").strip())) is None:
+            msg = "Unsupported WAQL"
+            raise WaapiError(msg, "ak.wwise.query.syntax_error")
+
+        if match["type"]:
+            found = [obj for obj in self._objects.values() if obj.type == match["type"]]
+        else:
+            obj = self._resolve(match["object"])
+            if match["select"] == "descendants":
+                found = obj.descendants()
+            elif match["select"] == "children":
+                found = list(obj.children)
+            else:
+                found = [obj]
+
+        conditions = re.split(r"\s+and\s+", match["where"] or "", flags=re.IGNORECASE)
+        for condition in filter(None, conditions):
+            if (parts := _CONDITION.fullmatch(condition.strip())) is None:
+                msg = f"Unsupported condition {condition}"
+                raise WaapiError(msg, "ak.wwise.query.syntax_error")
+            key, op, raw = parts.groups()
+            value = raw.strip('"') if raw.startswith('"') else float(raw)
+            found = [obj for obj in found if _OPERATORS[op](obj.get(key), value)]
+
+        returned = options.get("return", ["id", "name"])
+        return {"return": [_describe(obj, returned) for obj in found]}
+
+    def _create(self, args: dict[str, Any], _options: dict[str, Any]) -> Any:
+        parent = self._resolve(args["parent"])
+        properties = {
+            key[1:]: value for key, value in args.items() if key.startswith("@")
+        }
+        obj = self._add(args["name"], args["type"], parent, properties)
+        self._publish_object("ak.wwise.core.object.created", obj)
+        return {"id": obj.id, "name": obj.name}
+
+    def _delete(self, args: dict[str, Any], _options: dict[str, Any]) -> Any:
+        obj = self._resolve(args["object"])
+        if obj.parent is None:
+            msg = "Cannot delete the root"
+            raise WaapiError(msg, "ak.wwise.invalid_arguments")
+        self._publish_object("ak.wwise.core.object.preDeleted", obj)
+        obj.parent.children.remove(obj)
+        for removed in [obj, *obj.descendants()]:
+            del self._objects[removed.id]
+        return {}
+
+    def _set(self, args: dict[str, Any], _options: dict[str, Any]) -> Any:
+        replace = args.get("listMode", "replaceAll") == "replaceAll"
+        results: list[dict[str, Any]] = []
+        for spec in args["objects"]:
+            obj = self._resolve(spec["object"])
+            for key, value in spec.items():
+                if not key.startswith("@"):
+                    continue
+                if not isinstance(value, list):
+                    obj.properties[key[1:]] = value
+                    continue
+                # Object lists, such as `@Cues`, hold children of the object.
+                if replace:
+                    for child in [c for c in obj.children if c.type == "MusicCue"]:
+                        self._delete({"object": child.id}, {})
+                for item in cast("list[dict[str, Any]]", value):
+                    self._create({**item, "parent": obj.id}, {})
+            results.append({"id": obj.id})
+        return {"objects": results}
+
+    def _save(self, _args: dict[str, Any], _options: dict[str, Any]) -> Any:
+        self.save_count += 1
+        return {}
+
+    def _publish_object(self, topic: str, obj: WwiseObject) -> None:
+        self.publish(topic, {"object": _describe(obj, ["id", "name", "path", "type"])})
+
+
+def _describe(obj: WwiseObject, returned: list[str]) -> dict[str, Any]:
+    return {key: obj.get(key) for key in returned}
+
+
+def _new_id() -> str:
+    return f"{{{str(uuid.uuid4()).upper()}}}"
+
+
+class _WampSession(WebSocketServerProtocol):
+    """A WAMP session of the JSON serialization, serving one `StandInWwise`."""
+
+    wwise: StandInWwise
+    latency: float
+    sessions: "set[_WampSession]"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._subscriptions: dict[str, int] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @override
+    def onConnect(self, request: Any) -> str:
+        self.sessions.add(self)
+        return "wamp.2.json"
+
+    @override
+    def onClose(self, wasClean: bool, code: int | None, reason: str | None) -> None:
+        self.sessions.discard(self)
+
+    @override
+    def onMessage(self, payload: bytes, isBinary: bool) -> None:
+        task = asyncio.ensure_future(self._handle(json.loads(payload)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def publish(self, topic: str, event: dict[str, Any]) -> None:
+        if (subscription := self._subscriptions.get(topic)) is not None:
+            self._send_message([_EVENT, subscription, next(_ids), {}, [], event])
+
+    async def _handle(self, message: list[Any]) -> None:
+        code = message[0]
+        if code == _HELLO:
+            roles: dict[str, dict[str, Any]] = {"broker": {}, "dealer": {}}
+            self._send_message([_WELCOME, next(_ids), {"roles": roles}])
+        elif code == _GOODBYE:
+            self._send_message([_GOODBYE, {}, "wamp.error.goodbye_and_out"])
+        elif code == _SUBSCRIBE:
+            _, request, _options, topic = message
+            self._subscriptions[topic] = subscription = next(_ids)
+            self._send_message([_SUBSCRIBED, request, subscription])
+        elif code == _UNSUBSCRIBE:
+            _, request, subscription = message
+            self._subscriptions = {
+                topic: sub
+                for topic, sub in self._subscriptions.items()
+                if sub != subscription
+            }
+            self._send_message([_UNSUBSCRIBED, request])
+        elif code == _CALL:
+            await self._call(message)
+
+    async def _call(self, message: list[Any]) -> None:
+        _, request, options, uri, *rest = message
+        args: dict[str, Any] = rest[1] if len(rest) > 1 else {}
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            result = self.wwise.call(uri, args, options)
+        except WaapiError as e:
+            error = {"message": str(e)}
+            self._send_message([_ERROR, _CALL, request, {}, e.uri, [], error])
+        else:
+            self._send_message([_RESULT, request, {}, [], result])
+
+    def _send_message(self, message: list[Any]) -> None:
+        self.sendMessage(json.dumps(message).encode())  # type: ignore
+
+
+_ids = itertools.count(1)
+
+
+async def serve(wwise: StandInWwise, host: str, port: int, latency_ms: float) -> None:
+    """Serve until cancelled. Prints the WAAPI URL once listening."""
+    sessions: set[_WampSession] = set()
+
+    def publish(topic: str, event: dict[str, Any]) -> None:
+        for session in sessions:
+            session.publish(topic, event)
+
+    wwise.publish = publish
+    protocol = type(
+        "WampSession",
+        (_WampSession,),
+        {"wwise": wwise, "latency": latency_ms / 1000, "sessions": sessions},
+    )
+    factory = WebSocketServerFactory(protocols=["wamp.2.json"])
+    factory.protocol = protocol
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(factory, host, port)  # type: ignore
+    bound_port = server.sockets[0].getsockname()[1]
+    print(f"Serving ws://{host}:{bound_port}/waapi", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+@contextmanager
+def running(segment_count: int = 1, latency_ms: float = 0.0) -> Generator[str]:
+    """Serve a fresh project from a child process. Yields the WAAPI URL.
+
+    A child process keeps the server off the client's event loop: both sides use
+    autobahn, whose txaio configuration is process-wide.
+    """
+    args = ["--port", "0", "--segments", str(segment_count)]
+    args += ["--latency-ms", str(latency_ms)]
+    process = sp.Popen(
+        [sys.executable, "-m", "bench.waapi_standin", *args],
+        cwd=_REPO_DIR,
+        stdout=sp.PIPE,
+        text=True,
+    )
+    try:
+        assert process.stdout is not None
+        yield process.stdout.readline().split()[-1]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a stand-in WAAPI.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--segments", type=int, default=10)
+    args = parser.parse_args()
+
+    wwise = StandInWwise(args.segments)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(wwise, "127.0.0.1", args.port, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
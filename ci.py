@@ -13,7 +13,7 @@ def _tool_call(args: Iterable[str]) -> None:
 
 
 def lint(unsafe: Any = False) -> None:
-    targets = ["wet", "ci.py"]
+    targets = ["wet", "bench", "ci.py"]
 
     if unsafe:
         _tool_call(["ruff", "check", "--fix", "--unsafe-fixes", *targets])
@@ -29,10 +29,28 @@ def type_check() -> None:
     _tool_call(["pyright", "-p", "wet", "--threads", "16"])
 
 
+def bench(*args: str) -> None:
+    """Benchmark cue export against the offline WAAPI stand-in."""
+    _tool_call(["python", "-m", "bench.export_throughput", *args])
+
+
+def bench_hot_paths(*args: str) -> None:
+    """Benchmark tapping, calibration and tap file IO on synthetic data."""
+    _tool_call(["python", "-m", "bench.hot_paths", *args])
+
+
 def run_all() -> None:
     lint()
     type_check()
 
 
 if __name__ == "__main__":
-    Fire({"all": run_all, "lint": lint, "type-check": type_check})
+    Fire(
+        {
+            "all": run_all,
+            "lint": lint,
+            "type-check": type_check,
+            "bench": bench,
+            "bench-hot-paths": bench_hot_paths,
+        }
+    )
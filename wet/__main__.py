@@ -1,33 +1,119 @@
+import argparse
 import logging
 import sys
+import tempfile
+import wave
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from PySide6.QtGui import QFont, QFontDatabase
-from PySide6.QtWidgets import QApplication
-
-from wet.components.main_window import AppMainWindow
+from wet.startup import StartupProfile
 from wet.util import REPO_ROOT
 
+if TYPE_CHECKING:
+    from PySide6.QtCore import Qt
+
 _logger = logging.getLogger("wwise-event-tapper")
 
+# Kept in sync with `wet.components.playback.ENGINES`, which imports Qt.
+_ENGINE_NAMES = ("pcm", "qt")
+
+
+def _key_map(spec: str) -> "dict[Qt.Key, str]":
+    from wet.components.key_map import parse_key_map
+
+    try:
+        return parse_key_map(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def _parse_args() -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(
+        prog="wet",
+        description="Wwise Event Tapper. Run `wet batch --help` for headless use.",
+    )
+    parser.add_argument(
+        "--audio-engine",
+        choices=_ENGINE_NAMES,
+        default="qt",
+        help="Playback backend: Qt Multimedia, or PCM pushed to a small buffer.",
+    )
+    parser.add_argument(
+        "--tracks",
+        type=_key_map,
+        metavar="KEYS",
+        help="Tap keys in lane order, as `key` or `key=track name`, comma-separated. "
+        "Defaults to J,K,L.",
+    )
+    parser.add_argument(
+        "--latency-test",
+        action="store_true",
+        help="Measure the playback position of the engine, then exit.",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print how long imports and components took to start, once loaded.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        help="On exit, write tap timings and WAAPI call latencies to this JSON file.",
+    )
+    # Leave the rest to Qt.
+    return parser.parse_known_args()
+
+
+def _run_latency_test(engine_name: str) -> None:
+    from wet.components.playback import ENGINES, measure_latency
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Three seconds of silence, so the test runs quietly.
+        path = Path(tmp) / "silence.wav"
+        with wave.open(str(path), "wb") as silence:
+            silence.setnchannels(2)
+            silence.setsampwidth(2)
+            silence.setframerate(48000)
+            silence.writeframes(bytes(3 * 48000 * 4))
+        report = measure_latency(ENGINES[engine_name](), str(path))
+    print(  # noqa: T201
+        f"{report.engine}: start delay {report.start_delay_ms:.1f} ms, "
+        f"resolution {report.resolution_ms:.2f} ms, "
+        f"jitter {report.jitter_ms:.2f} ms, drift {report.drift_ppm:.0f} ppm"
+    )
+
 
 def main() -> None:
+    profile = StartupProfile()
     if __debug__:
         logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     else:
         logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
 
-    app = QApplication(sys.argv)
+    if sys.argv[1:2] == ["batch"]:
+        from wet.batch import main as batch_main
 
-    # Apply global styles.
-    # -- qt_material must be imported after Qt.
-    from qt_material import apply_stylesheet  # type: ignore
+        sys.exit(batch_main(sys.argv[2:]))
 
-    apply_stylesheet(
-        app,
-        theme="light_blue_500.xml",
-        invert_secondary=True,
-        extra={"density_scale": "-1"},
-    )
+    _run_gui(profile)
+
+
+def _run_gui(profile: StartupProfile) -> None:
+    args, qt_args = _parse_args()
+
+    # Polars, waapi, Qt Multimedia and the stylesheet wait until the window is
+    # shown; see `AppMainWindow`.
+    with profile.phase("import", "PySide6"):
+        from PySide6.QtGui import QFont, QFontDatabase
+        from PySide6.QtWidgets import QApplication
+
+    with profile.phase("import", "main window"):
+        from wet.components.main_window import AppMainWindow
+
+    app = QApplication([sys.argv[0], *qt_args])
+    if args.latency_test:
+        _run_latency_test(args.audio_engine)
+        return
 
     # Load font & set antialiasing.
     path = REPO_ROOT / "assets" / "Roboto-VariableFont_wdth,wght.ttf"
@@ -41,9 +127,18 @@ def main() -> None:
     font.setStyleStrategy(QFont.StyleStrategy.PreferAntialias)
 
     # Init window and run app until end.
-    window = AppMainWindow()
-    window.show()
-    sys.exit(app.exec())
+    with profile.phase("build", "window"):
+        window = AppMainWindow(args.audio_engine, profile, args.tracks)
+        window.show()
+    profile.mark("window shown")
+    if args.profile_startup:
+        window.startup_finished.connect(lambda: print(profile.report()))  # noqa: T201
+    code = app.exec()
+    if args.metrics:
+        from wet import metrics
+
+        metrics.dump(args.metrics)
+    sys.exit(code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+
+def decode_mono(path: str | Path) -> tuple[npt.NDArray[np.float32], int]:
+    """Decode an audio file to mono samples in [-1, 1]. Returns (samples, rate)."""
+    # pydub looks for ffmpeg on import, which only decoding needs.
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(path).set_channels(1)
+    scale = float(1 << (8 * audio.sample_width - 1))
+    samples = np.asarray(audio.get_array_of_samples(), dtype=np.float32) / scale
+    return samples, audio.frame_rate
@@ -0,0 +1,233 @@
+"""Headless calibration of raw tap files: `python -m wet batch --help`.
+
+Never imports Qt, so it runs on build machines without a display.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import polars as pl
+
+from wet.calibration import calibrate_taps, export_cues, sync_cues
+from wet.chart import BINARY_SUFFIX, JSON_SUFFIX, is_chart, write_chart
+from wet.tap_io import SCHEMA, is_supported, read_taps, write_taps
+from wet.tempo import TempoMap
+
+if TYPE_CHECKING:
+    from wet.components.wwise_client import WwiseController
+
+_logger = getLogger("wwise-event-tapper")
+
+_OUTPUT_INFIX = ".calibrated"
+_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "json-chart": JSON_SUFFIX,
+    "binary-chart": BINARY_SUFFIX,
+}
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="wet batch", description="Calibrate raw tap files without the GUI."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        type=Path,
+        help="Raw tap files, or directories of them.",
+    )
+    tempo = parser.add_mutually_exclusive_group(required=True)
+    tempo.add_argument("--bpm", type=float, help="Constant tempo.")
+    tempo.add_argument(
+        "--tempo-map", type=Path, help="CSV of time_ms, bpm and beats_per_bar."
+    )
+    parser.add_argument(
+        "--offset", type=float, default=0.0, help="First beat with --bpm, in ms."
+    )
+    parser.add_argument(
+        "--out-dir", type=Path, default=Path("export") / "batch", help="Output folder."
+    )
+    parser.add_argument("--format", choices=sorted(_FORMATS), default="csv")
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes."
+    )
+    parser.add_argument(
+        "--segments",
+        type=Path,
+        help="CSV of `file` and `segment` (id, path or unique name) to push to.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("sync", "export"),
+        default="sync",
+        help="Sync the segment's custom cues, or only add new ones.",
+    )
+    parser.add_argument("--waapi-url", help="WAAPI server, if not the default.")
+    parser.add_argument(
+        "--metrics", type=Path, help="Write WAAPI call latencies to this JSON file."
+    )
+    args = parser.parse_args(argv)
+    if args.bpm is not None and args.bpm <= 0:
+        parser.error("--bpm must be positive")
+    return args
+
+
+def _collect_inputs(paths: list[Path]) -> list[Path]:
+    """Expand directories into their raw tap files, skipping earlier outputs."""
+    files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files += sorted(
+                child
+                for child in path.iterdir()
+                if is_supported(child) and _OUTPUT_INFIX not in child.suffixes
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def _calibrate_file(
+    raw_path: Path, out_path: Path, tempo_map: TempoMap, keep: bool
+) -> tuple[int, pl.DataFrame | None]:
+    """Calibrate one file and write it. Runs in a worker process.
+
+    Returns the tap count, and the calibrated taps if kept for pushing.
+    """
+    calibrated = calibrate_taps(read_taps(raw_path, SCHEMA), tempo_map)
+    if is_chart(out_path):
+        write_chart(calibrated, out_path, tempo_map)
+    else:
+        write_taps(calibrated, out_path)
+    return len(calibrated), calibrated if keep else None
+
+
+def _read_segment_map(path: Path) -> dict[str, str]:
+    """Read the `file` to `segment` mapping, keyed by file name."""
+    frame = pl.read_csv(
+        path, schema_overrides={"file": pl.String, "segment": pl.String}
+    )
+    return {
+        Path(file).name: segment
+        for file, segment in frame.select("file", "segment").iter_rows()
+    }
+
+
+def _resolve_segment(segment: str, segments: list[dict[str, str]]) -> str | None:
+    """Find a segment id by id, path or unique name."""
+    if segment.startswith("{"):
+        return segment
+    matches = [s["id"] for s in segments if segment in (s["path"], s["name"])]
+    if len(matches) != 1:
+        _logger.error(
+            "%s segment named %s", "No" if not matches else "More than one", segment
+        )
+        return None
+    return matches[0]
+
+
+def _push(
+    wwise: "WwiseController",
+    calibrated: dict[Path, pl.DataFrame],
+    segment_map: dict[str, str],
+    mode: Literal["sync", "export"],
+) -> bool:
+    """Push calibrated files to their mapped segments. Returns whether all did."""
+    segments = wwise.get_music_segments()
+    if not segments:
+        _logger.error("No music segments found; is Wwise running?")
+        return False
+
+    ok = True
+    for raw_path, frame in calibrated.items():
+        if (segment := segment_map.get(raw_path.name)) is None:
+            continue
+        if (segment_id := _resolve_segment(segment, segments)) is None:
+            ok = False
+            continue
+        if mode == "export":
+            created = export_cues(wwise, segment_id, frame)
+            ok &= created == len(frame)
+            message = f"Created {created}/{len(frame)} cues"
+        else:
+            result = sync_cues(wwise, segment_id, frame)
+            ok &= (result.created, result.moved, result.deleted) == (
+                result.to_create,
+                result.to_move,
+                result.to_delete,
+            )
+            message = "Already in sync" if result.in_sync else result.describe()
+        print(f"{raw_path} -> {segment}: {message}")
+    wwise.save_project()
+    return ok
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    tempo_map = (
+        TempoMap.read_csv(args.tempo_map)
+        if args.tempo_map
+        else TempoMap.constant(args.bpm, args.offset)
+    )
+    inputs = _collect_inputs(args.inputs)
+    if not inputs:
+        _logger.error("No raw tap files found")
+        return 1
+    segment_map = _read_segment_map(args.segments) if args.segments else {}
+    for name in segment_map.keys() - {path.name for path in inputs}:
+        _logger.warning("Mapped file %s is not among the inputs", name)
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = _OUTPUT_INFIX + _FORMATS[args.format]
+
+    ok = True
+    calibrated: dict[Path, pl.DataFrame] = {}
+    # Polars' thread pool does not survive forking.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max(args.jobs, 1), mp_context=context) as pool:
+        futures: dict[Path, tuple[Path, Future[tuple[int, pl.DataFrame | None]]]] = {}
+        for raw_path in inputs:
+            out_path = args.out_dir / (raw_path.stem + suffix)
+            keep = raw_path.name in segment_map
+            futures[raw_path] = (
+                out_path,
+                pool.submit(_calibrate_file, raw_path, out_path, tempo_map, keep),
+            )
+        for raw_path, (out_path, future) in futures.items():
+            try:
+                count, frame = future.result()
+            except Exception:
+                _logger.exception("Failed to calibrate %s", raw_path)
+                ok = False
+                continue
+            print(f"{raw_path} -> {out_path} ({count} taps)")
+            if frame is not None:
+                calibrated[raw_path] = frame
+
+    if segment_map:
+        from wet.components import wwise_client
+
+        if args.waapi_url:
+            wwise_client.configure_connection(args.waapi_url)
+        wwise = wwise_client.WwiseController(timeout=10.0)
+        wwise.connect()
+        try:
+            ok &= _push(wwise, calibrated, segment_map, args.mode)
+        finally:
+            wwise_client.shutdown_connection()
+    if args.metrics:
+        from wet import metrics
+
+        metrics.dump(args.metrics)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
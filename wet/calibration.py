@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from wet.onsets import snap_to_onsets
+from wet.tempo import TempoMap
+
+if TYPE_CHECKING:
+    from wet.components.wwise_client import WwiseController
+    from wet.util import ProgressCallback
+
+_logger = getLogger("wwise-event-tapper")
+
+
+def align_taps(
+    frame: pl.DataFrame,
+    shift_ms: float,
+    onsets_ms: npt.NDArray[np.float64] | None,
+    tolerance_ms: float,
+) -> pl.DataFrame:
+    """Move taps earlier by the tap shift, then snap them to nearby onsets.
+
+    Starts snap; ends of lifted taps move along with their starts.
+    """
+    starts = frame["start"].to_numpy()
+    aligned = starts - shift_ms
+    if onsets_ms is not None:
+        aligned = snap_to_onsets(aligned, onsets_ms, tolerance_ms)
+    moved = pl.Series(aligned - starts)
+    return frame.with_columns(
+        start=pl.Series(aligned),
+        end=pl.when(pl.col("end") > 0).then(pl.col("end") + moved).otherwise("end"),
+    )
+
+
+def calibrate_taps(frame: pl.DataFrame, tempo_map: TempoMap) -> pl.DataFrame:
+    """Snap raw taps to the beats of a tempo map."""
+    return tempo_map.calibrate(frame.lazy(), ("start", "end")).collect()
+
+
+def make_cue_frame(calibrated: pl.DataFrame) -> pl.DataFrame:
+    """Name calibrated taps as cues. Returns a frame of `name` and `time_ms`."""
+    return calibrated.select(
+        pl.format("{}_{}", "track", "start_sequence").alias("name"),
+        pl.col("start_calibrated").alias("time_ms"),
+    )
+
+
+def diff_cues(
+    existing: pl.DataFrame, desired: pl.DataFrame
+) -> tuple[pl.DataFrame, pl.DataFrame, list[str]]:
+    """Diff existing cues against desired ones by name.
+
+    `existing` has `id`, `name` and `time_ms`; `desired` has `name` and `time_ms`.
+    Returns (cues to create, cue times to update, cue ids to delete). Duplicate
+    names keep their first cue only, as a name can address a single cue.
+    """
+    desired = desired.unique("name", keep="first", maintain_order=True)
+    is_first = pl.col("name").is_first_distinct()
+    duplicate_ids = existing.filter(~is_first)["id"].to_list()
+
+    joined = desired.join(
+        existing.filter(is_first),
+        on="name",
+        how="full",
+        suffix="_existing",
+        coalesce=True,
+    )
+    creates = joined.filter(pl.col("id").is_null()).select("name", "time_ms")
+    updates = joined.filter(pl.col("time_ms") != pl.col("time_ms_existing")).select(
+        "id", "time_ms"
+    )
+    deletes = joined.filter(pl.col("time_ms").is_null())["id"].to_list()
+    return creates, updates, deletes + duplicate_ids
+
+
+def export_cues(
+    wwise: "WwiseController",
+    segment_id: str,
+    calibrated: pl.DataFrame,
+    progress: "ProgressCallback | None" = None,
+) -> int:
+    """Create cues from calibrated taps. Returns success count."""
+    cues = make_cue_frame(calibrated)
+    created = wwise.create_cues(segment_id, cues, progress=progress)
+
+    for cue_name in cues.filter(~pl.Series(created, dtype=pl.Boolean))["name"]:
+        _logger.warning("Failed to create cue: %s", cue_name)
+
+    return sum(created)
+
+
+@dataclass(frozen=True, slots=True)
+class SyncResult:
+    """Counts of cues changed by `sync_cues`, out of those to change."""
+
+    created: int = 0
+    to_create: int = 0
+    moved: int = 0
+    to_move: int = 0
+    deleted: int = 0
+    to_delete: int = 0
+
+    @property
+    def in_sync(self) -> bool:
+        return not (self.to_create or self.to_move or self.to_delete)
+
+    def describe(self) -> str:
+        return (
+            f"Created {self.created}/{self.to_create}, "
+            f"moved {self.moved}/{self.to_move} and "
+            f"deleted {self.deleted}/{self.to_delete} cues"
+        )
+
+
+def sync_cues(
+    wwise: "WwiseController",
+    segment_id: str,
+    calibrated: pl.DataFrame,
+    progress: "ProgressCallback | None" = None,
+) -> SyncResult:
+    """Update a segment's custom cues to match calibrated taps, in one undo step.
+
+    The project is left unsaved.
+    """
+    existing = wwise.get_custom_cues(segment_id)
+    creates, updates, deletes = diff_cues(existing, make_cue_frame(calibrated))
+    total = len(creates) + len(updates) + len(deletes)
+    if total == 0:
+        return SyncResult()
+
+    def progress_from(base: int) -> "ProgressCallback | None":
+        if (report := progress) is None:
+            return None
+        return lambda done, _: report(base + done, total)
+
+    with wwise.undo_group("Sync Cues"):
+        created = wwise.create_cues(segment_id, creates, progress=progress_from(0))
+        moved = wwise.set_cue_times(updates, progress_from(len(creates)))
+        deleted = wwise.delete_objects(
+            deletes, progress_from(len(creates) + len(updates))
+        )
+    return SyncResult(
+        sum(created), len(creates), moved, len(updates), deleted, len(deletes)
+    )
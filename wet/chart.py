@@ -0,0 +1,184 @@
+"""Charts of calibrated taps for game runtimes other than Wwise.
+
+A JSON chart holds, per track, the note times, durations, beats and bars as
+parallel arrays, after the tempo map.
+
+A binary chart is laid out for memory-mapping, all little-endian:
+
+- Header, 8 bytes: magic `WETC`, u16 version, u16 track count.
+- Index, 56 bytes per track: the name in UTF-8, NUL-padded to 32 bytes; u32 note
+  count; u32 reserved; u64 file offset of the times; u64 file offset of the
+  durations.
+- Data: per track, i32 note times in ms, ascending, then i32 durations in ms, 0 for
+  taps never lifted. Each array starts 8-byte aligned.
+
+Upcoming notes are then a binary search over a track's times away.
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+import numpy as np
+import numpy.typing as npt
+import orjson
+import polars as pl
+
+from wet.tempo import TempoMap
+
+_VERSION = 1
+_MAGIC = b"WETC"
+_HEADER = struct.Struct("<4sHH")
+_INDEX_ENTRY = struct.Struct("<32sIIQQ")
+_ALIGNMENT = 8
+_NOTE_DTYPE = np.dtype("<i4")
+
+JSON_SUFFIX = ".json"
+BINARY_SUFFIX = ".wetc"
+CHART_FILTER = "Charts (*.json *.wetc)"
+
+
+def is_chart(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in (JSON_SUFFIX, BINARY_SUFFIX)
+
+
+def _notes_by_track(calibrated: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    """Notes of each track, by time: `time_ms`, `duration_ms`, `beat` and `bar`."""
+    notes = calibrated.select(
+        "track",
+        pl.col("start_calibrated").alias("time_ms"),
+        pl.when(pl.col("end") > 0)
+        .then(pl.col("end_calibrated") - pl.col("start_calibrated"))
+        .otherwise(0)
+        .alias("duration_ms"),
+        pl.col("start_sequence").alias("beat"),
+        pl.col("start_bar").alias("bar"),
+    ).sort("track", "time_ms")
+    return {
+        str(track): frame.drop("track")
+        for (track,), frame in notes.partition_by(
+            "track", as_dict=True, maintain_order=True
+        ).items()
+    }
+
+
+def write_json_chart(
+    calibrated: pl.DataFrame, path: str | Path, tempo_map: TempoMap
+) -> None:
+    chart = {
+        "version": _VERSION,
+        "tempo": tempo_map.changes,
+        "tracks": [
+            {"name": track} | {name: notes[name].to_numpy() for name in notes.columns}
+            for track, notes in _notes_by_track(calibrated).items()
+        ],
+    }
+    Path(path).write_bytes(orjson.dumps(chart, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_binary_chart(calibrated: pl.DataFrame, path: str | Path) -> None:
+    tracks = _notes_by_track(calibrated)
+    offset = _HEADER.size + _INDEX_ENTRY.size * len(tracks)
+    index: list[bytes] = []
+    arrays: list[tuple[int, npt.NDArray[np.int32]]] = []
+    for track, notes in tracks.items():
+        name = track.encode()
+        if len(name) > 32:
+            msg = f"Track names must fit in 32 bytes of UTF-8: {track}"
+            raise ValueError(msg)
+        times = notes["time_ms"].cast(pl.Int32).to_numpy().astype(_NOTE_DTYPE)
+        durations = notes["duration_ms"].cast(pl.Int32).to_numpy().astype(_NOTE_DTYPE)
+        times_offset = _aligned(offset)
+        durations_offset = _aligned(times_offset + times.nbytes)
+        offset = durations_offset + durations.nbytes
+        index.append(
+            _INDEX_ENTRY.pack(name, len(times), 0, times_offset, durations_offset)
+        )
+        arrays += [(times_offset, times), (durations_offset, durations)]
+
+    with Path(path).open("wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(tracks)))
+        file.write(b"".join(index))
+        for array_offset, array in arrays:
+            file.write(bytes(array_offset - file.tell()))
+            file.write(array.tobytes())
+
+
+def write_chart(
+    calibrated: pl.DataFrame, path: str | Path, tempo_map: TempoMap
+) -> None:
+    """Write a JSON or binary chart by file extension."""
+    match Path(path).suffix.lower():
+        case suffix if suffix == JSON_SUFFIX:
+            write_json_chart(calibrated, path, tempo_map)
+        case suffix if suffix == BINARY_SUFFIX:
+            write_binary_chart(calibrated, path)
+        case suffix:
+            msg = f"Unsupported chart file type: {suffix or path}"
+            raise ValueError(msg)
+
+
+class BinaryChart:
+    """A memory-mapped binary chart.
+
+    Note arrays are views into the file, to be dropped before closing it.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with Path(path).open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, track_count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            msg = f"Not a version {_VERSION} binary chart: {path}"
+            raise ValueError(msg)
+        self._tracks: dict[str, tuple[int, int, int]] = {}
+        for i in range(track_count):
+            name, count, _, times_offset, durations_offset = _INDEX_ENTRY.unpack_from(
+                self._map, _HEADER.size + i * _INDEX_ENTRY.size
+            )
+            self._tracks[name.rstrip(b"\0").decode()] = (
+                count,
+                times_offset,
+                durations_offset,
+            )
+
+    @property
+    def tracks(self) -> list[str]:
+        return list(self._tracks)
+
+    def times(self, track: str) -> npt.NDArray[np.int32]:
+        count, offset, _ = self._tracks[track]
+        return np.frombuffer(self._map, _NOTE_DTYPE, count, offset)
+
+    def durations(self, track: str) -> npt.NDArray[np.int32]:
+        count, _, offset = self._tracks[track]
+        return np.frombuffer(self._map, _NOTE_DTYPE, count, offset)
+
+    def upcoming(self, track: str, from_ms: int, to_ms: int) -> slice:
+        """Indices of the track's notes in [`from_ms`, `to_ms`), by binary search."""
+        times = self.times(track)
+        return slice(
+            int(np.searchsorted(times, from_ms, "left")),
+            int(np.searchsorted(times, to_ms, "left")),
+        )
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
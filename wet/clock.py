@@ -0,0 +1,118 @@
+import time
+
+# Position reports further back than this from the interpolated position are seeks,
+# e.g. looping back to the start; closer ones are reporting jitter.
+_SEEK_TOLERANCE_MS = 100.0
+
+
+class PlaybackClock:
+    """A media position clock, interpolated between the player's position reports.
+
+    Players report their position on coarse ticks, so reading it directly quantizes
+    timestamps to the tick interval. This clock anchors each report to
+    `time.perf_counter_ns()` and advances from there at the playback rate.
+
+    While running, the position never moves backwards unless seeking: when a report
+    lands behind the interpolated position, the clock holds still until it catches
+    up. Interpolation stops after `max_extrapolation_ms` without a report, so a
+    stalled player does not run away.
+
+    All positions are in milliseconds. Not thread-safe.
+    """
+
+    def __init__(self, max_extrapolation_ms: float = 1000.0) -> None:
+        self._max_extrapolation_ms = max_extrapolation_ms
+        self._running = False
+        self._rate = 1.0
+        self._anchor_ms = 0.0
+        self._anchor_ns = time.perf_counter_ns()
+        # The position shown last before re-anchoring, held until caught up.
+        self._floor_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def position(self) -> float:
+        return self.position_at(time.perf_counter_ns())
+
+    def position_at(self, now_ns: int) -> float:
+        """Get the position at a `time.perf_counter_ns()` instant.
+
+        Instants before the latest report are extrapolated backwards from it.
+        """
+        if not self._running:
+            return self._anchor_ms
+        elapsed_ms = min((now_ns - self._anchor_ns) / 1e6, self._max_extrapolation_ms)
+        position = self._anchor_ms + elapsed_ms * self._rate
+        return max(position, self._floor_ms) if elapsed_ms >= 0 else position
+
+    def report(self, position_ms: float, now_ns: int | None = None) -> None:
+        """Anchor to a position reported by the player."""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        current = self.position_at(now_ns)
+        if not self._running or position_ms < current - _SEEK_TOLERANCE_MS:
+            self._anchor(position_ms, now_ns, floor_ms=position_ms)
+        else:
+            self._anchor(position_ms, now_ns, floor_ms=current)
+
+    def seek(self, position_ms: float) -> None:
+        self._anchor(position_ms, time.perf_counter_ns(), floor_ms=position_ms)
+
+    def set_running(self, running: bool) -> None:
+        if running == self._running:
+            return
+        now_ns = time.perf_counter_ns()
+        # Freeze on pause, or resume from the frozen position.
+        position = self.position_at(now_ns)
+        self._running = running
+        self._anchor(position, now_ns, floor_ms=position)
+
+    def set_rate(self, rate: float) -> None:
+        now_ns = time.perf_counter_ns()
+        position = self.position_at(now_ns)
+        self._rate = rate
+        self._anchor(position, now_ns, floor_ms=position)
+
+    def _anchor(self, position_ms: float, now_ns: int, floor_ms: float) -> None:
+        self._anchor_ms = position_ms
+        self._anchor_ns = now_ns
+        self._floor_ms = floor_ms
+
+
+class EventClock:
+    """Maps the millisecond timestamps of input events onto `perf_counter_ns()`.
+
+    Events are handled some time after they happen, so the offset between both
+    clocks is estimated by the smallest one observed, when handling was quickest.
+    The estimate may rise by `drift_ppm` to follow clock drift, and resets when the
+    event clock jumps, e.g. when it wraps around.
+    """
+
+    def __init__(self, drift_ppm: float = 100.0, max_delay_ms: float = 1000.0) -> None:
+        self._drift = drift_ppm / 1e6
+        self._max_delay_ns = int(max_delay_ms * 1e6)
+        self._offset_ns: int | None = None
+        self._updated_ns = 0
+
+    def to_perf_ns(self, event_ms: int, now_ns: int | None = None) -> int:
+        """Map the timestamp of an event being handled now."""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        if event_ms <= 0:
+            # Not provided by the platform.
+            return now_ns
+        candidate = now_ns - event_ms * 1_000_000
+        if (
+            self._offset_ns is None
+            or abs(candidate - self._offset_ns) > self._max_delay_ns
+        ):
+            self._offset_ns = candidate
+        else:
+            drifted = self._offset_ns + int((now_ns - self._updated_ns) * self._drift)
+            self._offset_ns = min(candidate, drifted)
+        self._updated_ns = now_ns
+        return event_ms * 1_000_000 + self._offset_ns
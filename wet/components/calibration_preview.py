@@ -0,0 +1,88 @@
+import polars as pl
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QGroupBox,
+    QHeaderView,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+_COLUMNS = ("Track", "Taps", "Mean error", "Max error", "Collisions")
+_TABLE_HEIGHT = 110
+
+
+def summarize(calibrated: pl.DataFrame) -> pl.DataFrame:
+    """Summarize calibrated taps per track, then over all tracks.
+
+    Errors are how far taps moved to their beats. Collisions are taps landing on a
+    beat already taken in their track, which then share a cue name.
+    """
+    error = (pl.col("start_calibrated") - pl.col("start")).abs()
+    stats = [
+        pl.len().alias("taps"),
+        error.mean().alias("mean_error"),
+        error.max().alias("max_error"),
+    ]
+    per_track = calibrated.group_by("track", maintain_order=True).agg(
+        *stats,
+        (pl.len() - pl.col("start_sequence").n_unique()).alias("collisions"),
+    )
+    total = calibrated.select(pl.lit("All").alias("track"), *stats).with_columns(
+        collisions=pl.lit(per_track["collisions"].sum())
+    )
+    return pl.concat([per_track.sort("track"), total], how="vertical_relaxed")
+
+
+class CalibrationPreview(QGroupBox):
+    """A table of calibration statistics, updated as the settings change."""
+
+    def __init__(self) -> None:
+        super().__init__("Preview (errors in ms)")
+
+        self._message = QLabel()
+        self._message.setStyleSheet("color: gray;")
+        self._table = QTableWidget(0, len(_COLUMNS))
+        self._table.setHorizontalHeaderLabels(_COLUMNS)
+        self._table.setFixedHeight(_TABLE_HEIGHT)
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self._table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self._table.verticalHeader().setVisible(False)
+        self._table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self._message)
+        layout.addWidget(self._table)
+        self.clear("No raw taps.")
+
+    def clear(self, message: str) -> None:
+        self._message.setText(message)
+        self._message.setVisible(True)
+        self._table.setRowCount(0)
+
+    def show_summary(self, summary: pl.DataFrame) -> None:
+        """Show the rows of `summarize`."""
+        self._message.setVisible(False)
+        self._table.setRowCount(len(summary))
+        for row, (track, taps, mean_error, max_error, collisions) in enumerate(
+            summary.iter_rows()
+        ):
+            cells = (
+                str(track),
+                str(taps),
+                f"{mean_error or 0:.1f}",
+                f"{max_error or 0:.1f}",
+                str(collisions),
+            )
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(
+                        Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                    )
+                self._table.setItem(row, column, item)
@@ -1,38 +1,75 @@
+from collections.abc import Callable
 from contextlib import suppress
 from logging import getLogger
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import polars as pl
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QSortFilterProxyModel, Qt, QTimer, Signal
+from PySide6.QtGui import QStandardItem, QStandardItemModel
 from PySide6.QtWidgets import (
     QComboBox,
+    QCompleter,
     QFileDialog,
     QGroupBox,
     QHBoxLayout,
     QLabel,
     QMessageBox,
+    QProgressBar,
     QVBoxLayout,
     QWidget,
 )
 
-from wet.components.tracks import SCHEMA as _TAP_SCHEMA
-from wet.components.util import make_button, make_spinbox
-from wet.components.wwise_client import WwiseController
-from wet.util import now
+from wet import workers
+from wet.calibration import align_taps, calibrate_taps, export_cues, sync_cues
+from wet.chart import CHART_FILTER, is_chart, write_chart
+from wet.components.calibration_preview import CalibrationPreview, summarize
+from wet.components.jobs import Job, JobFailedError
+from wet.components.segment_catalog import Segment, SegmentCatalog
+from wet.components.util import make_button, make_double_spinbox, make_spinbox
+from wet.components.wwise_client import ConnectionState, WwiseController
+from wet.onsets import OnsetEnvelope, estimate_tap_shift, load_onsets
+from wet.takes import DEFAULT_TOLERANCE_MS, merge_takes
+from wet.tap_io import FILE_FILTER, is_supported, read_taps, write_taps
+from wet.tap_io import SCHEMA as _TAP_SCHEMA
+from wet.tempo import TempoMap, estimate_tempo
+from wet.util import CACHE_DIR, LruCache, ProgressCallback, now
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
 _logger = getLogger("wwise-event-tapper")
 _ALIGN_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+_ONSET_CACHE_DIR = CACHE_DIR / "onsets"
+# Settings changes wait this long for the next one before updating the preview.
+_PREVIEW_DELAY_MS = 150
+_CALIBRATION_CACHE_SIZE = 8
+
+# (raw taps id, tap shift, snap tolerance, onsets id, tempo map)
+type _CalibrationKey = tuple[int, int, int, int, TempoMap]
+# (raw taps, onsets, calibrated taps)
+type _Calibration = tuple[pl.DataFrame, OnsetEnvelope | None, pl.DataFrame]
 
 
 class RawTapPathConfigurator(QWidget):
+    """Selects raw taps: one take, or several merged into consensus taps."""
+
+    frame_changed = Signal()
+
     def __init__(self) -> None:
         super().__init__()
 
         attr = QLabel("<strong>Raw taps:</strong> ")
         self._value = QLabel("<em>none</em>")
+        self._tolerance_spin = make_spinbox((1, 500))
         button = make_button("Select")
 
         self._value.setAlignment(_ALIGN_RIGHT)
+        self._tolerance_spin.setValue(DEFAULT_TOLERANCE_MS)
+        self._tolerance_spin.setPrefix("±")
+        self._tolerance_spin.setSuffix(" ms")
+        self._tolerance_spin.setToolTip("Merge taps of different takes this close.")
+        self._tolerance_spin.setVisible(False)
 
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -40,10 +77,13 @@ class RawTapPathConfigurator(QWidget):
         layout.addWidget(attr)
         layout.addWidget(self._value)
         layout.addStretch()
+        layout.addWidget(self._tolerance_spin)
         layout.addWidget(button)
 
         button.clicked.connect(self.on_select_button)
+        self._tolerance_spin.valueChanged.connect(self._merge_takes)
 
+        self._takes: list[pl.DataFrame] = []
         self._raw_taps: pl.DataFrame = pl.DataFrame((), _TAP_SCHEMA)
 
     @property
@@ -51,52 +91,179 @@ class RawTapPathConfigurator(QWidget):
         return self._raw_taps
 
     def load_raw_taps(self, path: str) -> None:
-        self._value.setText(path)
-        self._raw_taps = pl.read_csv(path, schema=_TAP_SCHEMA)
+        self.load_takes([path])
+
+    def load_takes(self, paths: list[str]) -> None:
+        """Load takes of the same song, merging them if there are several."""
+        takes: list[pl.DataFrame] = []
+        for path in paths:
+            try:
+                takes.append(read_taps(path, _TAP_SCHEMA))
+            except (OSError, ValueError, pl.exceptions.PolarsError) as e:
+                _logger.exception("Failed to load raw taps from %s", path)
+                QMessageBox.warning(self, "Load Failed", f"Failed to load {path}: {e}")
+                return
+        if len(paths) == 1:
+            self._value.setText(paths[0])
+            self._value.setToolTip("")
+        else:
+            self._value.setText(f"{len(paths)} takes")
+            self._value.setToolTip("\n".join(paths))
+        self._tolerance_spin.setVisible(len(takes) > 1)
+        self._takes = takes
+        self._merge_takes()
+
+    def _merge_takes(self) -> None:
+        if len(self._takes) == 1:
+            self._raw_taps = self._takes[0]
+        else:
+            self._raw_taps = merge_takes(self._takes, self._tolerance_spin.value())
+            _logger.info(
+                "Merged %d taps of %d takes into %d",
+                sum(len(take) for take in self._takes),
+                len(self._takes),
+                len(self._raw_taps),
+            )
+        self.frame_changed.emit()
 
     def on_select_button(self) -> None:
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Raw Tap Path", "", "CSV Files (*.csv);;All Files (*)"
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Raw Taps, or Several Takes", "", FILE_FILTER
         )
-        if not file_path:
+        if not file_paths:
             return
-        self.load_raw_taps(file_path)
+        self.load_takes(file_paths)
 
 
-def _calibrate_taps(frame: pl.DataFrame, bpm: int, offset: int) -> pl.DataFrame:
-    """Apply BPM calibration to raw taps."""
-    beat_duration = 60000.0 / bpm
+class TempoMapConfigurator(QWidget):
+    """Selects a tempo map CSV, which overrides the constant BPM and offset."""
 
-    def clamp_column(lazy_frame: pl.LazyFrame, tap_col: str) -> pl.LazyFrame:
-        seq = ((pl.col(tap_col) - offset) / beat_duration).round().cast(int)
-        ts = seq.mul(beat_duration).add(offset).cast(int)
-        return lazy_frame.with_columns(
-            seq.alias(f"{tap_col}_sequence"),
-            ts.alias(f"{tap_col}_calibrated"),
-        )
+    tempo_map_changed = Signal(bool)  # Whether a tempo map is set.
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        attr = QLabel("<strong>Tempo map:</strong> ")
+        self._value = QLabel("<em>constant</em>")
+        select_button = make_button("Select")
+        clear_button = make_button("Clear")
+
+        self._value.setAlignment(_ALIGN_RIGHT)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+        layout.addWidget(attr)
+        layout.addWidget(self._value)
+        layout.addStretch()
+        layout.addWidget(select_button)
+        layout.addWidget(clear_button)
+
+        select_button.clicked.connect(self.on_select_button)
+        clear_button.clicked.connect(self.clear)
+
+        self.tempo_map: TempoMap | None = None
+
+    def load_tempo_map(self, path: str) -> None:
+        try:
+            tempo_map = TempoMap.read_csv(path)
+        except (OSError, ValueError, pl.exceptions.PolarsError) as e:
+            _logger.exception("Failed to load the tempo map from %s", path)
+            QMessageBox.warning(self, "Load Failed", f"Failed to load {path}: {e}")
+            return
+        self._value.setText(f"{path} ({len(tempo_map.changes)} changes)")
+        self.tempo_map = tempo_map
+        self.tempo_map_changed.emit(True)
+
+    def clear(self) -> None:
+        self._value.setText("<em>constant</em>")
+        self.tempo_map = None
+        self.tempo_map_changed.emit(False)
 
-    result = clamp_column(frame.lazy(), "start")
-    result = clamp_column(result, "end")
-    return result.sort("start").collect()
+    def on_select_button(self) -> None:
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Tempo Map", "", "CSV Files (*.csv);;All Files (*)"
+        )
+        if file_path:
+            self.load_tempo_map(file_path)
 
 
 class TapCalibrator(QGroupBox):
+    # Relays connection changes from the connection thread to the GUI thread.
+    _wwise_state_changed = Signal(ConnectionState)
+    # Relays catalog changes, (upserted segments, removed ids), likewise.
+    _segments_changed = Signal(list, list)
+    # Relays finished onset analyses, (song path, future), from the executor.
+    _onsets_loaded = Signal(str, object)
+
     def __init__(self) -> None:
         super().__init__()
         self.setTitle("🛠️ Calibrator")
 
         self._wwise = WwiseController()
         self._raw_taps = RawTapPathConfigurator()
+        self._tempo_map = TempoMapConfigurator()
 
-        self._bpm_spin = make_spinbox((0, 400))
+        self._bpm_spin = make_double_spinbox((0, 400), decimals=3)
         self._bpm_spin.setValue(90)
         self._offset_spin = make_spinbox((0, 10000))
-
+        self._estimate_label = QLabel("Estimate:")
+        self._auto_button = make_button("Auto")
+        self._auto_button.clicked.connect(self._estimate_tempo)
+        for widget in (self._bpm_spin, self._offset_spin, self._auto_button):
+            self._tempo_map.tempo_map_changed.connect(widget.setDisabled)
+
+        # Onsets of the loaded song, analyzed in a worker process.
+        self._music_path = ""
+        self._onsets: OnsetEnvelope | None = None
+        self._onsets_loaded.connect(self._on_onsets_loaded)
+
+        # Calibrations by their inputs, shared by the preview and exports.
+        self._calibrations = LruCache[_CalibrationKey, _Calibration](
+            _CALIBRATION_CACHE_SIZE
+        )
+        self._preview = CalibrationPreview()
+
+        # Segments are sorted by a proxy model, and filtered by the completer while
+        # typing in the combo box.
+        self._catalog = SegmentCatalog(self._wwise)
+        self._segment_items: dict[str, QStandardItem] = {}
+        self._segment_model = QStandardItemModel()
+        segment_proxy = QSortFilterProxyModel(self)
+        segment_proxy.setSourceModel(self._segment_model)
+        segment_proxy.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        segment_proxy.sort(0)
         self._segment_combo = QComboBox()
         self._segment_combo.setMinimumWidth(200)
+        self._segment_combo.setModel(segment_proxy)
+        self._segment_combo.setEditable(True)
+        self._segment_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        completer = QCompleter(segment_proxy, self)
+        completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self._segment_combo.setCompleter(completer)
+        self._segments_changed.connect(self._on_segments_changed)
+        self._catalog.add_listener(self._segments_changed.emit)
+
+        # Background jobs by key, with their latest (done, total).
+        self._jobs: dict[str, Job] = {}
+        self._job_progress: dict[str, tuple[int, int]] = {}
+        self._progress_bar = QProgressBar()
+        self._progress_bar.setFixedHeight(23)
+        self._cancel_button = make_button("Cancel")
+        self._cancel_button.clicked.connect(self._cancel_jobs)
+
+        self._wwise_state_label = QLabel()
+        self._wwise_state_changed.connect(self._on_wwise_state_changed)
+        self._wwise.add_state_listener(self._wwise_state_changed.emit)
 
         self._setup_layouts()
-        self._refresh_segments()
+        self._setup_preview()
+        self._update_job_status()
+        self._on_wwise_state_changed(self._wwise.state)
+        # Segments are listed once connected; startup never waits for Wwise.
+        self._wwise.connect()
 
     def _setup_layouts(self) -> None:
         """Create and arrange UI layouts."""
@@ -105,6 +272,7 @@ class TapCalibrator(QGroupBox):
 
         # Raw taps section
         main_layout.addWidget(self._raw_taps)
+        main_layout.addWidget(self._tempo_map)
 
         # Calibration settings section
         calibration_group = QGroupBox("Calibration Settings")
@@ -121,21 +289,72 @@ class TapCalibrator(QGroupBox):
         offset_layout.addWidget(QLabel("Offset (ms):"))
         offset_layout.addWidget(self._offset_spin)
 
+        # Tempo estimation
+        auto_layout = QVBoxLayout()
+        auto_layout.addWidget(self._estimate_label)
+        auto_layout.addWidget(self._auto_button)
+
         # Export button
         export_layout = QVBoxLayout()
         export_layout.addWidget(QLabel("Export:"))
-        export_button = make_button("Export CSV")
-        export_button.clicked.connect(self._export_csv)
+        export_button = make_button("Export File")
+        export_button.clicked.connect(self._export_file)
         export_layout.addWidget(export_button)
 
         calibration_layout.addLayout(bpm_layout)
         calibration_layout.addLayout(offset_layout)
+        calibration_layout.addLayout(auto_layout)
         calibration_layout.addStretch()
         calibration_layout.addLayout(export_layout)
 
         main_layout.addWidget(calibration_group)
+        main_layout.addWidget(self._make_alignment_group())
+        main_layout.addWidget(self._preview)
 
         # Wwise section
+        main_layout.addWidget(self._make_wwise_group())
+
+    def _make_alignment_group(self) -> QGroupBox:
+        """Create the audio alignment section."""
+        alignment_group = QGroupBox("Audio Alignment")
+        alignment_layout = QHBoxLayout(alignment_group)
+        alignment_layout.setSpacing(15)
+
+        self._onset_label = QLabel("<em>no song</em>")
+        self._tap_shift_spin = make_spinbox((-1000, 1000))
+        self._align_button = make_button("Align")
+        self._align_button.setEnabled(False)
+        self._align_button.clicked.connect(self._align_to_onsets)
+        self._snap_spin = make_spinbox((0, 200))
+        self._snap_spin.setEnabled(False)
+        self._snap_spin.setToolTip("Snap taps to onsets this close, in ms. 0 is off.")
+
+        onset_layout = QVBoxLayout()
+        onset_layout.addWidget(QLabel("Onsets:"))
+        onset_layout.addWidget(self._onset_label)
+
+        shift_layout = QVBoxLayout()
+        shift_layout.addWidget(QLabel("Tap shift (ms):"))
+        shift_layout.addWidget(self._tap_shift_spin)
+
+        align_layout = QVBoxLayout()
+        align_layout.addWidget(QLabel("Estimate:"))
+        align_layout.addWidget(self._align_button)
+
+        snap_layout = QVBoxLayout()
+        snap_layout.addWidget(QLabel("Snap (ms):"))
+        snap_layout.addWidget(self._snap_spin)
+
+        alignment_layout.addLayout(onset_layout)
+        alignment_layout.addStretch()
+        alignment_layout.addLayout(shift_layout)
+        alignment_layout.addLayout(align_layout)
+        alignment_layout.addLayout(snap_layout)
+
+        return alignment_group
+
+    def _make_wwise_group(self) -> QGroupBox:
+        """Create the Wwise integration section."""
         wwise_group = QGroupBox("Wwise Integration")
         wwise_layout = QVBoxLayout(wwise_group)
         wwise_layout.setSpacing(10)
@@ -144,6 +363,7 @@ class TapCalibrator(QGroupBox):
         segment_layout = QHBoxLayout()
         segment_layout.addWidget(QLabel("Target Segment:"))
         segment_layout.addWidget(self._segment_combo)
+        segment_layout.addWidget(self._wwise_state_label)
 
         # Action buttons row
         actions_layout = QHBoxLayout()
@@ -153,53 +373,281 @@ class TapCalibrator(QGroupBox):
         self._clear_button.clicked.connect(self._clear_cues)
         self._export_wwise_button = make_button("Export to Wwise")
         self._export_wwise_button.clicked.connect(self._export_to_wwise)
+        self._sync_wwise_button = make_button("Sync to Wwise")
+        self._sync_wwise_button.clicked.connect(self._sync_to_wwise)
 
         actions_layout.addWidget(self._refresh_button)
         actions_layout.addStretch()
         actions_layout.addWidget(self._clear_button)
         actions_layout.addWidget(self._export_wwise_button)
+        actions_layout.addWidget(self._sync_wwise_button)
+
+        # Job progress row, shown while jobs run
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self._progress_bar)
+        progress_layout.addWidget(self._cancel_button)
 
         wwise_layout.addLayout(segment_layout)
         wwise_layout.addLayout(actions_layout)
+        wwise_layout.addLayout(progress_layout)
 
-        main_layout.addWidget(wwise_group)
-
-    def __del__(self) -> None:
-        self._wwise.disconnect()
+        return wwise_group
 
     def on_tracks_exported(self, path: str) -> None:
         self._raw_taps.load_raw_taps(path)
 
-    def _validate_export_params(self) -> tuple[bool, int, int]:
-        """Validate BPM and offset parameters. Returns (valid, bpm, offset)."""
-        if self._raw_taps.frame.is_empty():
-            QMessageBox.warning(self, "No Data", "Please export raw taps first.")
-            return False, 0, 0
+    def on_music_loaded(self, path: str) -> None:
+        """Analyze the onsets of a newly loaded song in the background."""
+        self._music_path = path
+        self._onsets = None
+        self._onset_label.setText("<em>analyzing…</em>")
+        self._align_button.setEnabled(False)
+        self._snap_spin.setEnabled(False)
+        future = workers.submit(load_onsets, path, _ONSET_CACHE_DIR)
+        # Runs in an executor thread, so relay through a queued signal.
+        future.add_done_callback(lambda done: self._onsets_loaded.emit(path, done))
+
+    def _on_onsets_loaded(self, path: str, future: "Future[OnsetEnvelope]") -> None:
+        if path != self._music_path or future.cancelled():
+            return
+        try:
+            self._onsets = future.result()
+        except Exception:
+            _logger.exception("Failed to analyze the onsets of %s", path)
+            self._onset_label.setText("<em>analysis failed</em>")
+            return
+        self._onset_label.setText(f"{len(self._onsets.onsets_ms)} found")
+        self._align_button.setEnabled(True)
+        self._snap_spin.setEnabled(True)
+        self._schedule_preview()
+
+    def _align_to_onsets(self) -> None:
+        """Fill in the tap shift that lines the raw taps up with the onsets best."""
+        if self._onsets is None:
+            return
+        try:
+            shift = estimate_tap_shift(
+                self._raw_taps.frame["start"].to_numpy(), self._onsets
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Not Enough Data", str(e))
+            return
+        _logger.info("Estimated tap shift: %.1f ms", shift)
+        self._tap_shift_spin.setValue(round(shift))
+
+    def _snapping_onsets(self) -> OnsetEnvelope | None:
+        """The onsets to snap taps to, if snapping."""
+        if self._snap_spin.isEnabled() and self._snap_spin.value():
+            return self._onsets
+        return None
+
+    def _aligned_taps(self) -> pl.DataFrame:
+        """The raw taps, shifted and snapped to onsets as configured."""
+        onsets = self._snapping_onsets()
+        return align_taps(
+            self._raw_taps.frame,
+            self._tap_shift_spin.value(),
+            None if onsets is None else onsets.onsets_ms,
+            self._snap_spin.value(),
+        )
 
+    def _calibrated_taps(self, tempo_map: TempoMap) -> pl.DataFrame:
+        """Calibrate the aligned taps, memoized by the settings they come from."""
+        raw_taps = self._raw_taps.frame
+        onsets = self._snapping_onsets()
+        key = (
+            id(raw_taps),
+            self._tap_shift_spin.value(),
+            self._snap_spin.value() if onsets is not None else 0,
+            id(onsets),
+            tempo_map,
+        )
+        if (calibration := self._calibrations.get(key)) is not None:
+            return calibration[-1]
+        calibrated = calibrate_taps(self._aligned_taps(), tempo_map)
+        # Holding the keyed objects keeps their ids from being reused.
+        self._calibrations.put(key, (raw_taps, onsets, calibrated))
+        return calibrated
+
+    def _setup_preview(self) -> None:
+        """Update the preview shortly after any calibration setting changes."""
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(_PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._update_preview)
+        for signal in (
+            self._raw_taps.frame_changed,
+            self._tempo_map.tempo_map_changed,
+            self._bpm_spin.valueChanged,
+            self._offset_spin.valueChanged,
+            self._tap_shift_spin.valueChanged,
+            self._snap_spin.valueChanged,
+        ):
+            # Not `start` itself, which would take the signal's value as interval.
+            signal.connect(self._schedule_preview)
+
+    def _schedule_preview(self, *_: object) -> None:
+        self._preview_timer.start()
+
+    def _update_preview(self) -> None:
+        if self._raw_taps.frame.is_empty():
+            self._preview.clear("No raw taps.")
+            return
+        tempo_map = self._current_tempo_map()
+        if tempo_map is None:
+            self._preview.clear("Set a non-zero BPM.")
+            return
+        self._preview.show_summary(summarize(self._calibrated_taps(tempo_map)))
+
+    def _estimate_tempo(self) -> None:
+        """Fill in the BPM and offset that fit the aligned taps best."""
+        starts = self._aligned_taps()["start"].to_numpy()
+        try:
+            estimate = estimate_tempo(starts)
+        except ValueError as e:
+            QMessageBox.warning(self, "Not Enough Data", str(e))
+            return
+        _logger.info("Estimated tempo: %s", estimate)
+        self._bpm_spin.setValue(estimate.bpm)
+        self._offset_spin.setValue(round(estimate.offset_ms))
+        self._estimate_label.setText(f"Estimate ({estimate.confidence:.0%}):")
+
+    def _current_tempo_map(self) -> TempoMap | None:
+        """The configured tempo map, else the constant one, unless the BPM is 0."""
+        if self._tempo_map.tempo_map is not None:
+            return self._tempo_map.tempo_map
         bpm = self._bpm_spin.value()
-        offset = self._offset_spin.value()
+        return TempoMap.constant(bpm, self._offset_spin.value()) if bpm else None
+
+    def _validate_export_params(self) -> TempoMap | None:
+        """Validate calibration parameters. Returns the tempo map, if valid."""
+        if self._raw_taps.frame.is_empty():
+            QMessageBox.warning(self, "No Data", "Please export raw taps first.")
+            return None
 
-        if not bpm:
+        tempo_map = self._current_tempo_map()
+        if tempo_map is None:
             QMessageBox.warning(self, "BPM Not Set", "Please set a non-zero BPM.")
-            return False, 0, 0
+        return tempo_map
 
-        return True, bpm, offset
+    def _on_wwise_state_changed(self, state: ConnectionState) -> None:
+        color = {
+            ConnectionState.DISCONNECTED: "#e74c3c",
+            ConnectionState.CONNECTING: "#f39c12",
+            ConnectionState.CONNECTED: "#27ae60",
+        }[state]
+        self._wwise_state_label.setText(f"<span style='color: {color}'>●</span>")
+        self._wwise_state_label.setToolTip(f"Wwise: {state.value}")
 
     def _refresh_segments(self) -> None:
-        """Refresh available music segments list."""
-        self._segment_combo.clear()
-        for segment in self._wwise.get_music_segments():
-            name = segment.get("name")  # type: ignore[assignment]
-            path = segment.get("path")  # type: ignore[assignment]
-            if name and path:
-                display_name = f"{name} ({path})"
-                self._segment_combo.addItem(display_name, segment.get("id"))  # type: ignore[arg-type]
+        """Reload the segment catalog. It normally follows Wwise by itself."""
+
+        def task(_progress: ProgressCallback) -> str:
+            self._catalog.load()
+            return f"Found {len(self._catalog.segments())} music segments."
+
+        self._start_job("segment catalog", "Refresh Segments", task)
+
+    def _on_segments_changed(self, upserted: list[Segment], removed: list[str]) -> None:
+        """Patch the segment model with catalog changes, keyed by segment id.
+
+        Segments both removed and upserted, as on reload, keep their items, and so
+        the selection.
+        """
+        upserted_ids = {segment.id for segment in upserted}
+        for segment_id in removed:
+            if segment_id in upserted_ids:
+                continue
+            if (item := self._segment_items.pop(segment_id, None)) is not None:
+                self._segment_model.removeRow(item.row())
+
+        for segment in upserted:
+            text = f"{segment.name} ({segment.path})"
+            if (item := self._segment_items.get(segment.id)) is not None:
+                item.setText(text)
+                continue
+            item = QStandardItem(text)
+            item.setData(segment.id, Qt.ItemDataRole.UserRole)
+            self._segment_model.appendRow(item)
+            self._segment_items[segment.id] = item
 
     def _get_selected_segment(self) -> tuple[str | None, str]:
-        """Get selected segment ID and name. Returns (id, name)."""
-        segment_id = self._segment_combo.currentData()  # type: ignore[assignment]
-        segment_name = self._segment_combo.currentText().split(" (")[0]
-        return segment_id, segment_name
+        """Get the segment named by the combo text. Returns (id, name).
+
+        The text may be typed: it resolves as an item's text, a path or a unique
+        name, case-insensitively, or else to no segment.
+        """
+        text = self._segment_combo.currentText().strip()
+        index = self._segment_combo.findText(text, Qt.MatchFlag.MatchFixedString)
+        segment_id: str | None = self._segment_combo.itemData(index)
+        if segment_id is not None:
+            segment = self._catalog.get(segment_id)
+        else:
+            matches = [
+                segment
+                for segment in self._catalog.segments()
+                if text.casefold() in (segment.path.casefold(), segment.name.casefold())
+            ]
+            segment = matches[0] if len(matches) == 1 else None
+        if segment is None:
+            return None, ""
+        return segment.id, segment.name
+
+    def _start_job(
+        self, key: str, title: str, task: Callable[[ProgressCallback], str]
+    ) -> None:
+        """Run a task in the background, one job per key (segment or file)."""
+        if key in self._jobs:
+            QMessageBox.warning(self, "Busy", "A job for this target is running.")
+            return
+
+        job = Job(key, title, task)
+        job.signals.progress.connect(self._on_job_progress)
+        job.signals.succeeded.connect(self._on_job_succeeded)
+        job.signals.failed.connect(self._on_job_failed)
+        job.signals.cancelled.connect(self._on_job_cancelled)
+        job.signals.finished.connect(self._on_job_finished)
+        self._jobs[key] = job
+        self._job_progress[key] = 0, 0
+        self._update_job_status()
+        job.start()
+
+    def _cancel_jobs(self) -> None:
+        for job in self._jobs.values():
+            job.cancel()
+        self._cancel_button.setEnabled(False)
+
+    def _on_job_progress(self, key: str, done: int, total: int) -> None:
+        self._job_progress[key] = done, total
+        self._update_job_status()
+
+    def _on_job_succeeded(self, key: str, message: str) -> None:
+        QMessageBox.information(self, self._jobs[key].title, message)
+
+    def _on_job_failed(self, key: str, message: str) -> None:
+        QMessageBox.warning(self, self._jobs[key].title, message)
+
+    def _on_job_cancelled(self, key: str) -> None:
+        _logger.info("Cancelled: %s", self._jobs[key].title)
+
+    def _on_job_finished(self, key: str) -> None:
+        del self._jobs[key]
+        del self._job_progress[key]
+        self._update_job_status()
+
+    def _update_job_status(self) -> None:
+        """Show the progress of running jobs, or hide it when idle."""
+        self._progress_bar.setVisible(bool(self._jobs))
+        self._cancel_button.setVisible(bool(self._jobs))
+        if not self._jobs:
+            self._cancel_button.setEnabled(True)
+            return
+
+        done = sum(done for done, _ in self._job_progress.values())
+        total = sum(total for _, total in self._job_progress.values())
+        # A zero maximum shows a busy indicator until the first report.
+        self._progress_bar.setMaximum(total)
+        self._progress_bar.setValue(done)
 
     def _clear_cues(self) -> None:
         """Clear custom cues from selected segment."""
@@ -214,21 +662,22 @@ class TapCalibrator(QGroupBox):
             f"Delete all custom cues from '{segment_name}'?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
 
-        if reply == QMessageBox.StandardButton.Yes:
-            deleted_count = self._wwise.clear_custom_cues(segment_id)
-            if deleted_count > 0:
-                self._wwise.save_project()
-                QMessageBox.information(
-                    self, "Cues Cleared", f"Deleted {deleted_count} custom cues."
-                )
-            else:
-                QMessageBox.information(self, "No Cues", "No custom cues found.")
+        def task(progress: ProgressCallback) -> str:
+            deleted_count = self._wwise.clear_custom_cues(segment_id, progress)
+            if deleted_count == 0:
+                return "No custom cues found."
+            self._wwise.save_project()
+            return f"Deleted {deleted_count} custom cues."
+
+        self._start_job(segment_id, "Clear Cues", task)
 
     def _export_to_wwise(self) -> None:
         """Export calibrated taps to Wwise as cues."""
-        valid, bpm, offset = self._validate_export_params()
-        if not valid:
+        tempo_map = self._validate_export_params()
+        if tempo_map is None:
             return
 
         segment_id, segment_name = self._get_selected_segment()
@@ -236,40 +685,48 @@ class TapCalibrator(QGroupBox):
             QMessageBox.warning(self, "No Selection", "Please select a music segment.")
             return
 
-        calibrated_data = _calibrate_taps(self._raw_taps.frame, bpm, offset)
-        success_count = self._create_cues_from_data(calibrated_data, segment_id)
-        total_count = len(calibrated_data)
+        calibrated_data = self._calibrated_taps(tempo_map)
 
-        if success_count > 0:
-            self._wwise.save_project()
-            QMessageBox.information(
-                self,
-                "Export Complete",
-                f"Created {success_count}/{total_count} cues in '{segment_name}'.",
+        def task(progress: ProgressCallback) -> str:
+            success_count = export_cues(
+                self._wwise, segment_id, calibrated_data, progress
             )
-        else:
-            QMessageBox.warning(self, "Export Failed", "Failed to create any cues.")
-
-    def _create_cues_from_data(self, data: pl.DataFrame, segment_id: str) -> int:
-        """Create cues from calibrated data. Returns success count."""
-        success_count = 0
-
-        for row in data.iter_rows(named=True):
-            track = row["track"]
-            sequence = row["start_sequence"]
-            time_ms = row["start_calibrated"]
-            cue_name = f"{track}_{sequence}"
-            if self._wwise.create_cue(cue_name, segment_id, time_ms):
-                success_count += 1
-            else:
-                _logger.warning("Failed to create cue: %s", cue_name)
+            total_count = len(calibrated_data)
+
+            if success_count == 0:
+                msg = "Failed to create any cues."
+                raise JobFailedError(msg)
+            self._wwise.save_project()
+            return f"Created {success_count}/{total_count} cues in '{segment_name}'."
 
-        return success_count
+        self._start_job(segment_id, "Export to Wwise", task)
 
-    def _export_csv(self) -> None:
-        """Export calibrated taps to CSV file."""
-        valid, bpm, offset = self._validate_export_params()
-        if not valid:
+    def _sync_to_wwise(self) -> None:
+        """Update the segment's custom cues to match calibrated taps."""
+        tempo_map = self._validate_export_params()
+        if tempo_map is None:
+            return
+
+        segment_id, segment_name = self._get_selected_segment()
+        if not segment_id:
+            QMessageBox.warning(self, "No Selection", "Please select a music segment.")
+            return
+
+        calibrated_data = self._calibrated_taps(tempo_map)
+
+        def task(progress: ProgressCallback) -> str:
+            result = sync_cues(self._wwise, segment_id, calibrated_data, progress)
+            if result.in_sync:
+                return f"'{segment_name}' is already in sync."
+            self._wwise.save_project()
+            return f"{result.describe()} in '{segment_name}'."
+
+        self._start_job(segment_id, "Sync to Wwise", task)
+
+    def _export_file(self) -> None:
+        """Export calibrated taps to a tap file, or to a JSON or binary chart."""
+        tempo_map = self._validate_export_params()
+        if tempo_map is None:
             return
 
         with suppress(OSError):
@@ -279,12 +736,22 @@ class TapCalibrator(QGroupBox):
             self,
             "Select Export Path",
             f"export/calibrated_taps.{now():%Y%m%d_%H%M%S}.csv",
-            "CSV Files (*.csv);;All Files (*)",
+            f"{FILE_FILTER};;{CHART_FILTER}",
         )
         if not file_path:
             return
+        if not is_supported(file_path) and not is_chart(file_path):
+            file_path += ".csv"
 
-        calibrated_data = _calibrate_taps(self._raw_taps.frame, bpm, offset)
-        calibrated_data.write_csv(file_path)
+        calibrated_data = self._calibrated_taps(tempo_map)
+
+        def task(progress: ProgressCallback) -> str:
+            progress(1, 2)
+            if is_chart(file_path):
+                write_chart(calibrated_data, file_path, tempo_map)
+            else:
+                write_taps(calibrated_data, file_path)
+            progress(2, 2)
+            return f"Exported to {file_path}"
 
-        QMessageBox.information(self, "Export Complete", f"Exported to {file_path}")
+        self._start_job(file_path, "Export File", task)
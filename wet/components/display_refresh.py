@@ -0,0 +1,47 @@
+from collections.abc import Callable
+
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtGui import QGuiApplication
+
+_FALLBACK_RATE_HZ = 60.0
+
+
+class DisplayRefresh(QObject):
+    """Runs scheduled widget updates once per display frame.
+
+    Updates scheduled several times within a frame run once, so widgets fed by fast
+    events publish only their latest values. The timer stops while idle.
+    """
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._pending: dict[Callable[[], None], None] = {}
+        rate = QGuiApplication.primaryScreen().refreshRate()
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(round(1000 / (rate or _FALLBACK_RATE_HZ)))
+        self._timer.timeout.connect(self._flush)
+
+    def schedule(self, update: Callable[[], None]) -> None:
+        self._pending[update] = None
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            self._timer.stop()
+            return
+        pending, self._pending = self._pending, {}
+        for update in pending:
+            update()
+
+
+_refresh: DisplayRefresh | None = None
+
+
+def display_refresh() -> DisplayRefresh:
+    """The refresh shared by all widgets, created with the first one."""
+    global _refresh  # noqa: PLW0603
+    if _refresh is None:
+        _refresh = DisplayRefresh(QGuiApplication.instance())
+    return _refresh
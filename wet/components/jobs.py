@@ -0,0 +1,74 @@
+from collections.abc import Callable
+from logging import getLogger
+from threading import Event
+from typing import override
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from wet.util import ProgressCallback
+
+_logger = getLogger("wwise-event-tapper")
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class JobFailedError(Exception):
+    """An expected failure, whose message is meant for the user."""
+
+
+class _JobSignals(QObject):
+    # All signals carry the job key first.
+    progress = Signal(str, int, int)
+    succeeded = Signal(str, str)
+    failed = Signal(str, str)
+    cancelled = Signal(str)
+    finished = Signal(str)
+
+
+class Job(QRunnable):
+    """A task run on the global thread pool, reporting back through Qt signals.
+
+    The task receives a progress callback, which raises `JobCancelledError` once
+    the job is cancelled, and returns a message for the user.
+    Signals are emitted from the pool thread and delivered in the GUI thread.
+    """
+
+    def __init__(
+        self, key: str, title: str, task: Callable[[ProgressCallback], str]
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.title = title
+        self.signals = _JobSignals()
+        self._task = task
+        self._cancel = Event()
+
+    def start(self) -> None:
+        QThreadPool.globalInstance().start(self)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _report(self, done: int, total: int) -> None:
+        if self._cancel.is_set():
+            raise JobCancelledError
+        self.signals.progress.emit(self.key, done, total)
+
+    @override
+    def run(self) -> None:
+        try:
+            message = self._task(self._report)
+        except JobCancelledError:
+            self.signals.cancelled.emit(self.key)
+        except JobFailedError as e:
+            self.signals.failed.emit(self.key, str(e))
+        except Exception as e:
+            _logger.exception("Job failed: %s", self.title)
+            self.signals.failed.emit(self.key, f"Unexpected error: {e}")
+        else:
+            self.signals.succeeded.emit(self.key, message)
+        finally:
+            self.signals.finished.emit(self.key)
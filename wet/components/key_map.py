@@ -0,0 +1,42 @@
+from typing import cast
+
+from PySide6.QtCore import QKeyCombination, Qt
+from PySide6.QtGui import QKeySequence
+
+DEFAULT_KEY_MAP_SPEC = "J,K,L"
+# Keys with another use while tapping.
+_RESERVED_KEYS = (Qt.Key.Key_Space,)
+
+
+def parse_key_map(spec: str) -> dict[Qt.Key, str]:
+    """Parse comma-separated `key` or `key=track name` entries, in lane order.
+
+    Keys are as Qt names them, e.g. `A`, `;` or `F1`. Tracks are named after their
+    key unless named explicitly.
+    """
+    key_map: dict[Qt.Key, str] = {}
+    for entry in spec.split(","):
+        key_text, _, name = entry.partition("=")
+        sequence = QKeySequence.fromString(key_text.strip())
+        if sequence.count() != 1:
+            msg = f"Not a single key: {key_text!r}"
+            raise ValueError(msg)
+        combination = cast("QKeyCombination", sequence[0])  # type: ignore[index]
+        key = combination.key()
+        if (
+            combination.keyboardModifiers() != Qt.KeyboardModifier.NoModifier
+            or key == Qt.Key.Key_unknown
+        ):
+            msg = f"Not a single key without modifiers: {key_text!r}"
+            raise ValueError(msg)
+        if key in _RESERVED_KEYS:
+            msg = f"{key_text.strip()} is reserved"
+            raise ValueError(msg)
+        if key in key_map:
+            msg = f"{key_text.strip()} is mapped twice"
+            raise ValueError(msg)
+        key_map[key] = name.strip() or sequence.toString()
+    if len(set(key_map.values())) != len(key_map):
+        msg = "Track names must be unique"
+        raise ValueError(msg)
+    return key_map
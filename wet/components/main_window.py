@@ -1,32 +1,66 @@
 from logging import getLogger
-from typing import override
+from typing import TYPE_CHECKING, override
+
+from PySide6.QtCore import QPoint, Qt, QTimer, Signal
+from PySide6.QtGui import QCloseEvent, QMouseEvent, QPaintEvent
+from PySide6.QtWidgets import (
+    QAbstractSpinBox,
+    QApplication,
+    QMainWindow,
+    QVBoxLayout,
+    QWidget,
+)
+
+from wet import workers
+from wet.components.title_bar import TitleBar
+from wet.startup import StartupProfile
 
-from PySide6.QtCore import QPoint, Qt
-from PySide6.QtGui import QKeyEvent, QMouseEvent
-from PySide6.QtWidgets import QApplication, QMainWindow, QSpinBox, QVBoxLayout, QWidget
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
-from wet.components import wwise_client
-from wet.components.calibrator import TapCalibrator
-from wet.components.music_player import MusicPlayer
-from wet.components.title_bar import TitleBar
-from wet.components.tracks import TapTracksContainer
+    from wet.components.calibrator import TapCalibrator
+    from wet.components.music_player import MusicPlayer
+    from wet.components.tap_capture import TapKeyFilter
+    from wet.components.tracks import TapTracksContainer
 
 _logger = getLogger("wwise-event-tapper")
 
 
 class AppMainWindow(QMainWindow):
-    def __init__(self) -> None:
+    """The app window, shown with its title bar alone.
+
+    The components are built in stages after the first frame, one per event loop
+    turn, so the window paints early and stays responsive while polars, Qt
+    Multimedia and waapi are imported.
+    """
+
+    startup_finished = Signal()
+
+    def __init__(
+        self,
+        engine_name: str = "qt",
+        profile: StartupProfile | None = None,
+        key_map: dict[Qt.Key, str] | None = None,
+    ) -> None:
         super().__init__()
 
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint)
         self.setWindowTitle("Wwise Event Tapper")
-        self.setFixedSize(500, 800)
-
-        self._player = MusicPlayer()
-        self._tap_tracks = TapTracksContainer()
-        self._calibrator = TapCalibrator()
-
-        self._tap_tracks.tracks_exported.connect(self._calibrator.on_tracks_exported)
+        self.setFixedSize(500, 940)
+
+        self._engine_name = engine_name
+        self._key_map = key_map
+        self._profile = profile or StartupProfile()
+        self._player: MusicPlayer | None = None
+        self._tap_tracks: TapTracksContainer | None = None
+        self._tap_filter: TapKeyFilter | None = None
+        self._calibrator: TapCalibrator | None = None
+        self._stages: list[Callable[[], None]] = [
+            self._apply_style,
+            self._build_tapping,
+            self._build_calibrator,
+        ]
+        self._first_frame = True
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -36,45 +70,87 @@ class AppMainWindow(QMainWindow):
         layout.addWidget(title_bar)
 
         # For contents, add some margin.
-        layout1 = QVBoxLayout()
-        layout1.setContentsMargins(10, 10, 10, 10)
-        layout1.addWidget(self._player)
-        layout1.addWidget(self._tap_tracks)
-        layout1.addWidget(self._calibrator)
+        self._content_layout = QVBoxLayout()
+        self._content_layout.setContentsMargins(10, 10, 10, 10)
 
-        layout.addLayout(layout1)
+        layout.addLayout(self._content_layout)
         layout.addStretch()
 
         self._drag_start = QPoint()
 
     @override
-    def close(self) -> bool:
-        wwise_client.shutdown_instances()
-        return super().close()
-
-    @override
-    def keyPressEvent(self, event: QKeyEvent, /) -> None:
-        key = Qt.Key(event.key())
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if self._first_frame:
+            self._first_frame = False
+            self._profile.mark("first frame")
+            QTimer.singleShot(0, self._run_next_stage)
+
+    def _run_next_stage(self) -> None:
+        self._stages.pop(0)()
+        if self._stages:
+            QTimer.singleShot(0, self._run_next_stage)
+        else:
+            self._profile.mark("fully loaded")
+            self.startup_finished.emit()
+
+    def _apply_style(self) -> None:
+        with self._profile.phase("import", "qt_material"):
+            # qt_material must be imported after Qt.
+            from qt_material import apply_stylesheet  # type: ignore
+
+        with self._profile.phase("build", "stylesheet"):
+            apply_stylesheet(
+                QApplication.instance(),
+                theme="light_blue_500.xml",
+                invert_secondary=True,
+                extra={"density_scale": "-1"},
+            )
+
+    def _build_tapping(self) -> None:
+        with self._profile.phase("import", "playback, player, tracks"):
+            from wet.components.music_player import MusicPlayer
+            from wet.components.playback import ENGINES
+            from wet.components.tap_capture import TapKeyFilter
+            from wet.components.tracks import TapTracksContainer
+
+        with self._profile.phase("build", "player, tracks"):
+            self._player = MusicPlayer(ENGINES[self._engine_name]())
+            self._tap_tracks = TapTracksContainer(self._key_map)
+            self._tap_filter = TapKeyFilter(self._player, self._tap_tracks)
+            self._tap_filter.install()
+            self._content_layout.addWidget(self._player)
+            self._content_layout.addWidget(self._tap_tracks)
+        self._profile.mark("interactive")
+
+    def _build_calibrator(self) -> None:
+        assert self._player is not None
+        assert self._tap_tracks is not None
+
+        with self._profile.phase("import", "calibrator, waapi"):
+            from wet.components.calibrator import TapCalibrator
+
+        with self._profile.phase("build", "calibrator"):
+            self._calibrator = TapCalibrator()
+            self._content_layout.addWidget(self._calibrator)
 
-        if not event.isAutoRepeat():
-            if key == Qt.Key.Key_Space:
-                self._player.toggle_play()
-                return event.accept()
-
-            if self._player.playing:  # noqa: SIM102
-                if self._tap_tracks.tap(key, self._player.position, is_lift=False):
-                    return event.accept()
-
-        super().keyPressEvent(event)
+        self._tap_tracks.tracks_exported.connect(self._calibrator.on_tracks_exported)
+        self._player.music_loaded.connect(self._calibrator.on_music_loaded)
+        # The player may have loaded a song before the calibrator existed.
+        if self._player.loaded_source:
+            self._calibrator.on_music_loaded(self._player.loaded_source)
 
     @override
-    def keyReleaseEvent(self, event: QKeyEvent, /) -> None:
-        if not event.isAutoRepeat() and self._player.playing:
-            key = Qt.Key(event.key())
-            self._tap_tracks.tap(key, self._player.position, is_lift=True)
-            return event.accept()
+    def closeEvent(self, event: QCloseEvent) -> None:
+        # Any way of closing the window ends up here, the window manager's included.
+        if self._calibrator is not None:
+            from wet.components import wwise_client
 
-        super().keyReleaseEvent(event)
+            wwise_client.shutdown_connection()
+        workers.shutdown()
+        if self._tap_tracks is not None:
+            self._tap_tracks.close_journal()
+        super().closeEvent(event)
 
     @override
     def mousePressEvent(self, event: QMouseEvent) -> None:
@@ -82,6 +158,6 @@ class AppMainWindow(QMainWindow):
         # -- We emulate this effect by clearing the focus and then re-trigger
         # -- the mouse event.
         focused = QApplication.focusWidget()
-        if isinstance(focused, QSpinBox):
+        if isinstance(focused, QAbstractSpinBox):
             focused.clearFocus()
         super().mousePressEvent(event)
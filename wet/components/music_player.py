@@ -1,8 +1,7 @@
 import os
 from logging import getLogger
 
-from PySide6.QtCore import Qt, QUrl
-from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QFileDialog,
     QGroupBox,
@@ -13,7 +12,10 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
+from wet.components.display_refresh import display_refresh
+from wet.components.playback import PlaybackEngine, QtMediaEngine
 from wet.components.util import make_button
+from wet.components.waveform_view import WaveformView
 
 _logger = getLogger("wwise-event-tapper")
 
@@ -24,30 +26,38 @@ def _format_time(ms: int) -> str:
 
 
 class MusicPlayer(QGroupBox):
-    def __init__(self) -> None:
+    music_loaded = Signal(str)  # path
+
+    def __init__(self, engine: PlaybackEngine | None = None) -> None:
         super().__init__()
         self.setTitle("🎵 Music Status")
 
-        self._player = QMediaPlayer()
+        self._engine = engine or QtMediaEngine()
+        self._source = ""
+        self._loaded_source = ""
+        # The latest reported position, shown on the next display frame.
+        self._position = 0
         self._label = QLabel("No music loaded.")
         self._load_button = make_button("Select")
         self._play_button = make_button("Play", width=70)
+        self._waveform = WaveformView()
         self._progress_slider = QSlider(Qt.Orientation.Horizontal)
         self._progress_label = QLabel("00:00 / 00:00")
 
-        self._audio = QAudioOutput()
-        self._player.setAudioOutput(self._audio)
         self._load_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self._play_button.setEnabled(False)
         self._play_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self._progress_slider.setEnabled(False)
         self._progress_label.setStyleSheet("color: gray;")
 
-        self._player.positionChanged.connect(self._on_music_position_change)
-        self._player.mediaStatusChanged.connect(self._on_media_status_changed)
+        self._engine.position_changed.connect(self._on_music_position_change)
+        self._engine.playing_changed.connect(self._on_playing_changed)
+        self._engine.loaded.connect(self._on_loaded)
+        self._engine.load_failed.connect(self._on_load_failed)
         self._load_button.clicked.connect(self.load_music_file)
         self._play_button.clicked.connect(self.toggle_play)
-        self._progress_slider.sliderMoved.connect(self._player.setPosition)
+        self._progress_slider.sliderMoved.connect(self.seek)
+        self._waveform.seek_requested.connect(self.seek)
 
         progress_layout = QHBoxLayout()
         progress_layout.addWidget(self._play_button)
@@ -62,45 +72,67 @@ class MusicPlayer(QGroupBox):
         layout1.addStretch()
         layout1.addWidget(self._load_button)
         layout.addLayout(layout1)
+        layout.addWidget(self._waveform)
         layout.addLayout(progress_layout)
 
         if __debug__:
             self.load_music_file("assets/Alexander Klaws - Cry on My Shoulder.ogg")
 
     @property
-    def position(self) -> int:
-        return self._player.position()
+    def position(self) -> float:
+        """The playback position in milliseconds, interpolated between updates."""
+        return self._engine.position()
+
+    def position_at(self, perf_ns: int) -> float:
+        """The playback position at a past `time.perf_counter_ns()` instant."""
+        return self._engine.position_at(perf_ns)
+
+    @property
+    def loaded_source(self) -> str:
+        """The path of the music the engine has loaded, or empty."""
+        return self._loaded_source
 
     @property
     def playing(self) -> bool:
-        return self._player.isPlaying()
+        return self._engine.playing
 
     def toggle_play(self) -> None:
-        if self._player.isPlaying():
-            self._player.pause()
-            self._play_button.setText("Play")
+        if self._engine.playing:
+            self._engine.pause()
         else:
-            self._player.play()
-            self._play_button.setText("Pause")
+            self._engine.play()
+
+    def seek(self, position: int) -> None:
+        self._engine.seek(position)
+
+    def _on_playing_changed(self, playing: bool) -> None:
+        self._play_button.setText("Pause" if playing else "Play")
 
     def _on_music_position_change(self, value: int) -> None:
+        self._position = value
+        display_refresh().schedule(self._publish_position)
+
+    def _publish_position(self) -> None:
+        """Show the latest position, at most once per display frame."""
+        value = self._position
         self._progress_slider.setValue(value)
-        self._progress_label.setText(
-            f"{_format_time(value)} / {_format_time(self._player.duration())}"
-        )
-
-    def _on_media_status_changed(self, status: QMediaPlayer.MediaStatus) -> None:
-        if status == QMediaPlayer.MediaStatus.InvalidMedia:
-            message = f"Failed to load music at {self._player.source().toString()}"
-            _logger.error(message)
-            QMessageBox.warning(self, "Media Error", message)
-        elif status == QMediaPlayer.MediaStatus.LoadedMedia:
-            # Update the length label.
-            self._on_music_position_change(0)
-            self._progress_slider.setMaximum(self._player.duration())
-            self._progress_slider.setEnabled(True)
-        elif status == QMediaPlayer.MediaStatus.EndOfMedia:
-            self._play_button.setText("Play")
+        self._waveform.set_position(value)
+        text = f"{_format_time(value)} / {_format_time(self._engine.duration)}"
+        if text != self._progress_label.text():
+            self._progress_label.setText(text)
+
+    def _on_loaded(self, duration: int) -> None:
+        # Update the length label.
+        self._on_music_position_change(0)
+        self._progress_slider.setMaximum(duration)
+        self._progress_slider.setEnabled(True)
+        self._loaded_source = self._source
+        self.music_loaded.emit(self._source)
+
+    def _on_load_failed(self, reason: str) -> None:
+        message = f"Failed to load music at {self._source}: {reason}"
+        _logger.error(message)
+        QMessageBox.warning(self, "Media Error", message)
 
     def load_music_file(self, file_path: str = "") -> None:
         if not file_path:
@@ -114,7 +146,9 @@ class MusicPlayer(QGroupBox):
             _logger.info("No music selected")
             return
         self._label.setText(f"Loaded: <strong>{os.path.basename(file_path)}</strong>")
-        self._player.setSource(QUrl.fromLocalFile(file_path))
+        self._source = file_path
+        self._engine.load(file_path)
+        self._waveform.load(file_path)
         self._play_button.setText("Play")
         self._play_button.setEnabled(True)
-        # Further changes are delayed until MediaStatus changes to LoadedMedia.
+        # Further changes are delayed until the engine has loaded the file.
@@ -0,0 +1,401 @@
+import itertools
+import statistics
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Thread
+from typing import TYPE_CHECKING, ClassVar, override
+
+from PySide6.QtCore import QEventLoop, QIODevice, QObject, Qt, QTimer, QUrl, Signal
+from PySide6.QtMultimedia import (
+    QAudioFormat,
+    QAudioOutput,
+    QAudioSink,
+    QMediaDevices,
+    QMediaPlayer,
+    QtAudio,
+)
+
+from wet.clock import PlaybackClock
+
+if TYPE_CHECKING:
+    from pydub import AudioSegment
+
+_logger = getLogger("wwise-event-tapper")
+
+# Display updates, in ms. Taps read the precise position instead.
+_POSITION_NOTIFY_INTERVAL = 50
+
+
+class PlaybackEngine(QObject):
+    """Plays one music file and reports its position. Subclasses implement a backend.
+
+    Positions are in milliseconds. `position()` is as precise as the backend allows,
+    while `position_changed` only ticks for display.
+    """
+
+    name: ClassVar[str]
+
+    loaded = Signal(int)  # duration
+    load_failed = Signal(str)
+    position_changed = Signal(int)
+    playing_changed = Signal(bool)
+    ended = Signal()
+
+    def load(self, path: str) -> None:
+        """Start loading a file. Either `loaded` or `load_failed` follows."""
+        raise NotImplementedError
+
+    def play(self) -> None:
+        raise NotImplementedError
+
+    def pause(self) -> None:
+        raise NotImplementedError
+
+    def seek(self, position: int) -> None:
+        raise NotImplementedError
+
+    @property
+    def playing(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    def duration(self) -> int:
+        raise NotImplementedError
+
+    def position(self) -> float:
+        raise NotImplementedError
+
+    def position_at(self, perf_ns: int) -> float:
+        """Get the position at a past `time.perf_counter_ns()` instant."""
+        position = self.position()
+        if self.playing:
+            position -= (time.perf_counter_ns() - perf_ns) / 1e6
+        return position
+
+
+class QtMediaEngine(PlaybackEngine):
+    """QMediaPlayer, with its coarse position interpolated by a `PlaybackClock`."""
+
+    name = "qt"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._player = QMediaPlayer()
+        self._audio = QAudioOutput()
+        self._player.setAudioOutput(self._audio)
+        self._clock = PlaybackClock()
+
+        self._player.positionChanged.connect(self._clock.report)
+        self._player.positionChanged.connect(self.position_changed)
+        self._player.playbackStateChanged.connect(self._on_playback_state_changed)
+        self._player.playbackRateChanged.connect(self._clock.set_rate)
+        self._player.mediaStatusChanged.connect(self._on_media_status_changed)
+
+    @override
+    def load(self, path: str) -> None:
+        self._player.setSource(QUrl.fromLocalFile(path))
+
+    @override
+    def play(self) -> None:
+        self._player.play()
+
+    @override
+    def pause(self) -> None:
+        self._player.pause()
+
+    @override
+    def seek(self, position: int) -> None:
+        self._clock.seek(position)
+        self._player.setPosition(position)
+
+    @property
+    @override
+    def playing(self) -> bool:
+        return self._player.isPlaying()
+
+    @property
+    @override
+    def duration(self) -> int:
+        return self._player.duration()
+
+    @override
+    def position(self) -> float:
+        return self._clock.position()
+
+    @override
+    def position_at(self, perf_ns: int) -> float:
+        return self._clock.position_at(perf_ns)
+
+    def _on_playback_state_changed(self, state: QMediaPlayer.PlaybackState) -> None:
+        playing = state == QMediaPlayer.PlaybackState.PlayingState
+        self._clock.set_running(playing)
+        self.playing_changed.emit(playing)
+
+    def _on_media_status_changed(self, status: QMediaPlayer.MediaStatus) -> None:
+        if status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self.load_failed.emit(self._player.errorString())
+        elif status == QMediaPlayer.MediaStatus.LoadedMedia:
+            self.loaded.emit(self._player.duration())
+        elif status == QMediaPlayer.MediaStatus.EndOfMedia:
+            self.ended.emit()
+
+
+class PcmEngine(PlaybackEngine):
+    """Decodes the whole file to PCM and pushes it to a small-buffer audio sink.
+
+    The position is the count of samples written, minus those still queued in the
+    sink, so it follows what the device has consumed to the sample.
+    """
+
+    name = "pcm"
+
+    # Relays decoded audio, (load generation, audio or error), from the decoding
+    # thread.
+    _decoded = Signal(int, object)
+
+    def __init__(self, buffer_ms: int = 20) -> None:
+        super().__init__()
+        self._buffer_ms = buffer_ms
+        self._pcm = b""
+        # Counts loads, so that decodes finishing after a newer load are dropped.
+        self._generation = 0
+        self._format = QAudioFormat()
+        self._sink: QAudioSink | None = None
+        self._device: QIODevice | None = None
+        # Frames before the sink's start, and bytes written to it since.
+        self._start_frame = 0
+        self._written = 0
+
+        self._feed_timer = QTimer(self)
+        self._feed_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._feed_timer.setInterval(max(buffer_ms // 4, 1))
+        self._feed_timer.timeout.connect(self._feed)
+        self._notify_timer = QTimer(self)
+        self._notify_timer.setInterval(_POSITION_NOTIFY_INTERVAL)
+        self._notify_timer.timeout.connect(self._notify_position)
+        self._decoded.connect(self._on_decoded)
+
+    @override
+    def load(self, path: str) -> None:
+        if self.playing:
+            self.playing_changed.emit(False)
+        self._stop_sink()
+        self._start_frame = 0
+        # Nothing plays until the new file is decoded.
+        self._pcm = b""
+        self._generation += 1
+        # Match the device's preferred rate and channels, in 16-bit integers.
+        preferred = QMediaDevices.defaultAudioOutput().preferredFormat()
+        args = (
+            self._generation,
+            path,
+            preferred.sampleRate(),
+            min(preferred.channelCount(), 2),
+        )
+        Thread(target=self._decode, args=args, name="pcm-decode", daemon=True).start()
+
+    @override
+    def play(self) -> None:
+        if not self._pcm or self.playing:
+            return
+        if self._sink is not None:
+            self._sink.resume()
+            self._start_timers()
+        else:
+            if self._start_frame >= self._total_frames:
+                self._start_frame = 0
+            self._start_sink()
+        self.playing_changed.emit(True)
+
+    @override
+    def pause(self) -> None:
+        if self._sink is None or not self.playing:
+            return
+        self._sink.suspend()
+        self._feed_timer.stop()
+        self._notify_timer.stop()
+        self.playing_changed.emit(False)
+
+    @override
+    def seek(self, position: int) -> None:
+        playing = self.playing
+        self._stop_sink()
+        frame = self._format.framesForDuration(position * 1000)
+        self._start_frame = min(max(frame, 0), self._total_frames)
+        if playing:
+            self._start_sink()
+        self.position_changed.emit(position)
+
+    @property
+    @override
+    def playing(self) -> bool:
+        return self._sink is not None and self._feed_timer.isActive()
+
+    @property
+    @override
+    def duration(self) -> int:
+        return self._format.durationForFrames(self._total_frames) // 1000
+
+    @property
+    def latency(self) -> float:
+        """Audio queued in the sink, in ms."""
+        if self._sink is None:
+            return 0.0
+        queued = self._sink.bufferSize() - self._sink.bytesFree()
+        return self._format.durationForBytes(queued) / 1000
+
+    @override
+    def position(self) -> float:
+        frames = self._start_frame
+        if self._sink is not None:
+            queued = self._sink.bufferSize() - self._sink.bytesFree()
+            frames += self._format.framesForBytes(self._written - queued)
+        return self._format.durationForFrames(frames) / 1000
+
+    @property
+    def _total_frames(self) -> int:
+        return self._format.framesForBytes(len(self._pcm))
+
+    def _decode(
+        self, generation: int, path: str, frame_rate: int, channels: int
+    ) -> None:
+        # pydub looks for ffmpeg on import, which only this engine needs.
+        from pydub import AudioSegment
+
+        try:
+            audio = (
+                AudioSegment.from_file(path)
+                .set_sample_width(2)
+                .set_frame_rate(frame_rate)
+                .set_channels(channels)
+            )
+        except Exception as e:
+            _logger.exception("Failed to decode %s", path)
+            self._decoded.emit(generation, e)
+        else:
+            self._decoded.emit(generation, audio)
+
+    def _on_decoded(self, generation: int, audio: "AudioSegment | Exception") -> None:
+        if generation != self._generation:
+            return
+        if isinstance(audio, Exception):
+            self.load_failed.emit(str(audio))
+            return
+        self._format.setSampleRate(audio.frame_rate)
+        self._format.setChannelCount(audio.channels)
+        self._format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        self._pcm = audio.raw_data
+        self.loaded.emit(self.duration)
+
+    def _start_sink(self) -> None:
+        self._sink = QAudioSink(self._format, self)
+        self._sink.setBufferSize(self._format.bytesForDuration(self._buffer_ms * 1000))
+        self._written = 0
+        self._device = self._sink.start()
+        self._feed()
+        self._start_timers()
+
+    def _start_timers(self) -> None:
+        self._feed_timer.start()
+        self._notify_timer.start()
+
+    def _stop_sink(self) -> None:
+        self._feed_timer.stop()
+        self._notify_timer.stop()
+        if self._sink is not None:
+            self._start_frame = self._format.framesForDuration(
+                round(self.position() * 1000)
+            )
+            self._sink.stop()
+            self._sink.deleteLater()
+            self._sink = None
+            self._device = None
+
+    def _feed(self) -> None:
+        if self._sink is None or self._device is None:
+            return
+        offset = self._format.bytesForFrames(self._start_frame) + self._written
+        free = self._sink.bytesFree()
+        free -= free % self._format.bytesPerFrame()
+        if chunk := self._pcm[offset : offset + free]:
+            self._written += self._device.write(chunk)
+        elif self._sink.state() == QtAudio.State.IdleState:
+            # Drained: everything written has been played.
+            self._stop_sink()
+            self._start_frame = self._total_frames
+            self.position_changed.emit(self.duration)
+            self.playing_changed.emit(False)
+            self.ended.emit()
+
+    def _notify_position(self) -> None:
+        self.position_changed.emit(round(self.position()))
+
+
+ENGINES: dict[str, type[PlaybackEngine]] = {
+    QtMediaEngine.name: QtMediaEngine,
+    PcmEngine.name: PcmEngine,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LatencyReport:
+    engine: str
+    start_delay_ms: float  # From `play()` until the position first advances.
+    resolution_ms: float  # Median step between distinct positions.
+    jitter_ms: float  # Deviation of the position from the wall clock.
+    drift_ppm: float  # Rate error of the position against the wall clock.
+
+
+def measure_latency(
+    engine: PlaybackEngine, path: str, seconds: float = 2.0
+) -> LatencyReport:
+    """Play a file and compare the engine's position against `perf_counter`.
+
+    Runs a local event loop; call it from the GUI thread without other playback.
+    """
+    loop = QEventLoop()
+    engine.loaded.connect(loop.quit)
+    engine.load_failed.connect(loop.quit)
+    engine.load(path)
+    # Some backends load synchronously.
+    if not engine.duration:
+        QTimer.singleShot(10_000, loop.quit)
+        loop.exec()
+    if not engine.duration:
+        msg = f"Failed to load {path} for the latency test"
+        raise RuntimeError(msg)
+
+    samples: list[tuple[float, float]] = []  # (wall, position)
+    start = time.perf_counter()
+
+    def sample() -> None:
+        samples.append(((time.perf_counter() - start) * 1000, engine.position()))
+        if samples[-1][0] >= seconds * 1000:
+            loop.quit()
+
+    timer = QTimer()
+    timer.setTimerType(Qt.TimerType.PreciseTimer)
+    timer.setInterval(1)
+    timer.timeout.connect(sample)
+    engine.play()
+    timer.start()
+    loop.exec()
+    timer.stop()
+    engine.pause()
+    engine.seek(0)
+
+    moving = [(wall, pos) for wall, pos in samples if pos > samples[0][1]]
+    if len(moving) < 2:
+        msg = f"The {engine.name} engine did not advance during the latency test"
+        raise RuntimeError(msg)
+    steps = [b - a for (_, a), (_, b) in itertools.pairwise(moving) if b > a]
+    fit = statistics.linear_regression([w for w, _ in moving], [p for _, p in moving])
+    residuals = [pos - (fit.slope * wall + fit.intercept) for wall, pos in moving]
+    return LatencyReport(
+        engine=engine.name,
+        start_delay_ms=moving[0][0],
+        resolution_ms=statistics.median(steps),
+        jitter_ms=statistics.pstdev(residuals),
+        drift_ppm=(fit.slope - 1) * 1e6,
+    )
@@ -0,0 +1,130 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from logging import getLogger
+from threading import Lock
+from typing import Any
+
+from wet.components.wwise_client import ConnectionState, WwiseController
+
+_logger = getLogger("wwise-event-tapper")
+_EVENT_OPTIONS = {"return": ["id", "name", "path", "type"]}
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    id: str
+    name: str
+    path: str
+
+
+# (upserted segments, removed segment ids) -> None
+type CatalogListener = Callable[[list[Segment], list[str]], None]
+
+
+class SegmentCatalog:
+    """Music segments of the Wwise project, indexed by id and path.
+
+    The catalog loads once per connection, then follows object creation, deletion
+    and renaming through WAAPI subscriptions. Listeners receive what changed, from
+    background threads.
+    """
+
+    def __init__(self, wwise: WwiseController) -> None:
+        self._wwise = wwise
+        self._lock = Lock()
+        self._by_id: dict[str, Segment] = {}
+        self._by_path: dict[str, Segment] = {}
+        self._listeners: list[CatalogListener] = []
+        wwise.add_state_listener(self._on_state_changed)
+
+    def add_listener(self, listener: CatalogListener) -> None:
+        self._listeners.append(listener)
+
+    def get(self, segment_id: str) -> Segment | None:
+        return self._by_id.get(segment_id)
+
+    def find(self, path: str) -> Segment | None:
+        return self._by_path.get(path)
+
+    def segments(self) -> list[Segment]:
+        """Get all segments, ordered by path."""
+        with self._lock:
+            return sorted(self._by_id.values(), key=lambda segment: segment.path)
+
+    def load(self) -> None:
+        """Replace the catalog with a fresh query of all segments."""
+        segments = [
+            Segment(segment["id"], segment["name"], segment["path"])
+            for segment in self._wwise.get_music_segments()
+        ]
+        with self._lock:
+            removed = list(self._by_id)
+            self._by_id = {segment.id: segment for segment in segments}
+            self._by_path = {segment.path: segment for segment in segments}
+        self._notify(segments, removed)
+
+    def _on_state_changed(self, state: ConnectionState) -> None:
+        if state is not ConnectionState.CONNECTED:
+            return
+        # Subscribe first, so that nothing changing during the load is missed.
+        for uri, callback in (
+            ("ak.wwise.core.object.created", self._on_created),
+            ("ak.wwise.core.object.preDeleted", self._on_pre_deleted),
+            ("ak.wwise.core.object.nameChanged", self._on_name_changed),
+        ):
+            if not self._wwise.subscribe(uri, callback, **_EVENT_OPTIONS):
+                _logger.warning("Failed to subscribe to %s", uri)
+        self.load()
+
+    def _on_created(self, **event: Any) -> None:
+        obj = event.get("object", {})
+        if obj.get("type") != "MusicSegment":
+            return
+        segment = Segment(obj["id"], obj["name"], obj["path"])
+        with self._lock:
+            self._by_id[segment.id] = segment
+            self._by_path[segment.path] = segment
+        self._notify([segment], [])
+
+    def _on_pre_deleted(self, **event: Any) -> None:
+        # Deleting a folder deletes the segments below it too.
+        path = event.get("object", {}).get("path", "")
+        with self._lock:
+            removed = [
+                segment
+                for segment in self._by_id.values()
+                if _is_at_or_below(segment.path, path)
+            ]
+            for segment in removed:
+                del self._by_id[segment.id]
+                del self._by_path[segment.path]
+        if removed:
+            self._notify([], [segment.id for segment in removed])
+
+    def _on_name_changed(self, **event: Any) -> None:
+        # Renaming a folder moves the segments below it too.
+        obj = event.get("object", {})
+        new_path: str = obj.get("path", "")
+        old_path = f"{new_path.rpartition('\\')[0]}\\{event.get('oldName', '')}"
+        with self._lock:
+            renamed: list[Segment] = []
+            for segment in list(self._by_id.values()):
+                if not _is_at_or_below(segment.path, old_path):
+                    continue
+                name = obj["name"] if segment.id == obj.get("id") else segment.name
+                path = new_path + segment.path[len(old_path) :]
+                renamed.append(Segment(segment.id, name, path))
+                del self._by_path[segment.path]
+            for segment in renamed:
+                self._by_id[segment.id] = segment
+                self._by_path[segment.path] = segment
+        if renamed:
+            self._notify(renamed, [])
+
+    def _notify(self, upserted: list[Segment], removed: list[str]) -> None:
+        for listener in self._listeners:
+            listener(upserted, removed)
+
+
+def _is_at_or_below(path: str, ancestor: str) -> bool:
+    return bool(ancestor) and (path == ancestor or path.startswith(ancestor + "\\"))
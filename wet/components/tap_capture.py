@@ -0,0 +1,97 @@
+import time
+from collections.abc import Callable
+from typing import override
+
+from PySide6.QtCore import QEvent, QObject, Qt
+from PySide6.QtGui import QKeyEvent, QWindow
+from PySide6.QtWidgets import (
+    QAbstractSpinBox,
+    QApplication,
+    QComboBox,
+    QLineEdit,
+    QPlainTextEdit,
+    QTextEdit,
+)
+
+from wet import metrics
+from wet.clock import EventClock
+from wet.components.music_player import MusicPlayer
+from wet.components.tracks import TapTracksContainer
+
+# Widgets that take typing, and so keep their keys when focused.
+_EDITORS = (QAbstractSpinBox, QLineEdit, QPlainTextEdit, QTextEdit)
+
+
+class TapKeyFilter(QObject):
+    """Captures tap keys application-wide, stamped with the time they were pressed.
+
+    Key events are taken as they reach the window, before dispatch to widgets, and
+    their native timestamps are mapped onto the playback clock. Time spent by the
+    event loop before handling them thus no longer shifts the taps.
+    """
+
+    def __init__(self, player: MusicPlayer, tracks: TapTracksContainer) -> None:
+        super().__init__()
+        self._player = player
+        self._event_clock = EventClock()
+        # Key code -> handler of (is_lift, press time in perf_counter_ns).
+        self._handlers: dict[int, Callable[[bool, int], bool]] = {
+            Qt.Key.Key_Space.value: self._toggle_play,
+        }
+        for key, track in tracks.key_map.items():
+            self._handlers[key.value] = self._make_tap_handler(tracks, key, track)
+
+    def install(self) -> None:
+        if (app := QApplication.instance()) is not None:
+            app.installEventFilter(self)
+
+    @override
+    def eventFilter(self, watched: QObject, event: QEvent, /) -> bool:
+        event_type = event.type()
+        if (
+            event_type not in (QEvent.Type.KeyPress, QEvent.Type.KeyRelease)
+            or not isinstance(watched, QWindow)
+            or not isinstance(event, QKeyEvent)
+        ):
+            return False
+        handler = self._handlers.get(event.key())
+        if handler is None or event.isAutoRepeat() or _is_editing():
+            return False
+        perf_ns = self._event_clock.to_perf_ns(event.timestamp())
+        return handler(event_type == QEvent.Type.KeyRelease, perf_ns)
+
+    def _toggle_play(self, is_lift: bool, _perf_ns: int) -> bool:
+        if not is_lift:
+            self._player.toggle_play()
+        return True
+
+    def _make_tap_handler(
+        self, tracks: TapTracksContainer, key: Qt.Key, track: str
+    ) -> Callable[[bool, int], bool]:
+        def handler(is_lift: bool, perf_ns: int) -> bool:
+            handler_ns = time.perf_counter_ns()
+            if not self._player.playing:
+                return False
+            position_ms = self._player.position_at(perf_ns)
+            tapped = tracks.tap(key, position_ms, is_lift)
+            metrics.TAPS.record(
+                metrics.TapTiming(
+                    track,
+                    is_lift,
+                    perf_ns,
+                    handler_ns,
+                    time.perf_counter_ns(),
+                    position_ms,
+                    self._player.position_at(handler_ns),
+                )
+            )
+            return tapped
+
+        return handler
+
+
+def _is_editing() -> bool:
+    focused = QApplication.focusWidget()
+    if isinstance(focused, QComboBox):
+        return focused.isEditable()
+    return isinstance(focused, _EDITORS)
@@ -7,6 +7,7 @@ import polars as pl
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QFileDialog,
+    QGridLayout,
     QGroupBox,
     QHBoxLayout,
     QLabel,
@@ -14,23 +15,25 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
+from wet.components.display_refresh import display_refresh
+from wet.components.key_map import DEFAULT_KEY_MAP_SPEC, parse_key_map
 from wet.components.util import make_button
+from wet.journal import RecoveredJournals, TapJournal, new_journal_path
+from wet.tap_buffer import TapBuffer
+from wet.tap_io import FILE_FILTER, is_supported, write_taps
 
 _logger = getLogger("wwise-event-tapper")
 
-SCHEMA = pl.Schema(
-    {
-        "track": str,
-        "start": int,  # ms
-        "end": int,  # ms
-    }
-)
+_JOURNAL_DIR = Path("export") / "journal"
+# Lanes fill a column of this many rows, then two columns of as many as needed,
+# which leaves room for the export button.
+_LANES_PER_COLUMN = 4
 
 
 class TapTracksContainer(QGroupBox):
     tracks_exported = Signal(str)
 
-    def __init__(self) -> None:
+    def __init__(self, key_map: dict[Qt.Key, str] | None = None) -> None:
         super().__init__()
 
         self.setTitle("⭐ Tap Tracks")
@@ -38,26 +41,25 @@ class TapTracksContainer(QGroupBox):
         layout_l = QVBoxLayout()
         layout_l.setSpacing(10)
 
-        # Qt.Key -> milliseconds
-        self._track_taps: dict[Qt.Key, list[tuple[int, int]]] = {
-            Qt.Key.Key_J: [],
-            Qt.Key.Key_K: [],
-            Qt.Key.Key_L: [],
-        }
+        # Qt.Key -> track name
+        self._track_names = key_map or parse_key_map(DEFAULT_KEY_MAP_SPEC)
+        self._taps = TapBuffer(list(self._track_names.values()))
 
         self._track_count_labels: dict[Qt.Key, QLabel] = {}
-
-        # List tracks with a smaller spacing.
-        track_layout = QVBoxLayout()
-        for key in self._track_taps:
-            layout = QHBoxLayout()
-            track_label = QLabel(f"<strong>Track {key.name[4:]}</strong>")
+        # Tracks whose count changed since the labels were last updated.
+        self._dirty_counts: set[Qt.Key] = set()
+
+        # Lay lanes out in columns, with a smaller spacing.
+        track_layout = QGridLayout()
+        track_layout.setVerticalSpacing(4)
+        rows = max(_LANES_PER_COLUMN, -(-len(self._track_names) // 2))
+        for i, (key, name) in enumerate(self._track_names.items()):
+            row, column = i % rows, i // rows * 2
+            track_label = QLabel(f"<strong>Track {name}</strong>")
             count_label = QLabel("[count: 0]")
-            track_label.setFixedWidth(70)
-            layout.addWidget(track_label)
-            layout.addWidget(count_label)
-            track_layout.addLayout(layout)
-            track_layout.addStretch()
+            track_label.setMinimumWidth(70)
+            track_layout.addWidget(track_label, row, column)
+            track_layout.addWidget(count_label, row, column + 1)
             self._track_count_labels[key] = count_label
 
         layout_l.addLayout(track_layout)
@@ -65,7 +67,7 @@ class TapTracksContainer(QGroupBox):
 
         # Put the export button to the right
         export_button = make_button("Export")
-        export_button.clicked.connect(self.export_to_csv)
+        export_button.clicked.connect(self.export_taps)
         layout_r = QHBoxLayout()
         layout_r.addStretch()
         layout_r.addWidget(export_button)
@@ -78,20 +80,76 @@ class TapTracksContainer(QGroupBox):
         self._layout.addLayout(layout_tr)
 
         # Public for use in the calibration pass.
-        self.tap_csv_path: Path | None = None
+        self.tap_path: Path | None = None
+
+        self._journal, self._unexported = self._open_journal()
+        self._dirty_counts.update(self._track_names)
+        self._publish_counts()
 
-    def tap(self, key: Qt.Key, timestamp: int, is_lift: bool) -> bool:
+    @property
+    def key_map(self) -> dict[Qt.Key, str]:
+        """Track names by key, in lane order."""
+        return dict(self._track_names)
+
+    def tap(self, key: Qt.Key, timestamp: float, is_lift: bool) -> bool:
         """Add a tap if there is a track for the key."""
-        if (track := self._track_taps.get(key)) is not None:
+        if (track := self._track_names.get(key)) is not None:
             if is_lift:
-                track[-1] = track[-1][0], timestamp
+                self._taps.lift(track, timestamp)
+                self._journal.lift(track, timestamp)
             else:
-                track.append((timestamp, 0))
-            self._track_count_labels[key].setText(f"[count: {len(track)}]")
+                self._taps.press(track, timestamp)
+                self._journal.press(track, timestamp)
+                self._dirty_counts.add(key)
+                display_refresh().schedule(self._publish_counts)
+            self._unexported = True
             return True
         return False
 
-    def export_to_csv(self) -> None:
+    def close_journal(self) -> None:
+        """Stop journaling, keeping the journal only if some taps are unexported."""
+        self._journal.close(delete=not self._unexported)
+
+    def _open_journal(self) -> tuple[TapJournal, bool]:
+        """Start a journal, after recovering taps from journals left by a crash.
+
+        Returns the journal and whether taps were recovered.
+        """
+        try:
+            journals = RecoveredJournals(_JOURNAL_DIR)
+        except OSError:
+            _logger.exception("Failed to recover tap journals")
+            journals = None
+        journal = TapJournal(new_journal_path(_JOURNAL_DIR), self._taps.tracks)
+        if journals is None:
+            return journal, False
+        if (recovered := journals.taps) is None:
+            journals.delete()
+            return journal, False
+        _logger.info("Recovered %d taps from the last session", recovered.height)
+        mapped = recovered.filter(pl.col("track").is_in(self._taps.tracks))
+        if mapped.height < recovered.height:
+            # The key map changed since; keep the other tracks' taps in a file.
+            now = dt.datetime.now().astimezone()
+            path = _JOURNAL_DIR / f"recovered.{now:%Y%m%d_%H%M%S}.csv"
+            write_taps(recovered, path)
+            _logger.warning(
+                "Recovered taps of tracks without a key; all were saved to %s", path
+            )
+        self._taps.extend(mapped)
+        journal.write_frame(mapped)
+        # The old journals go only once their taps are on disk again.
+        journal.sync()
+        journals.delete()
+        return journal, True
+
+    def _publish_counts(self) -> None:
+        for key in self._dirty_counts:
+            count = self._taps.count(self._track_names[key])
+            self._track_count_labels[key].setText(f"[count: {count}]")
+        self._dirty_counts.clear()
+
+    def export_taps(self) -> None:
         with suppress(OSError):
             Path("export").mkdir(parents=True, exist_ok=True)
 
@@ -100,7 +158,7 @@ class TapTracksContainer(QGroupBox):
             self,
             "Export Tap Tracks",
             f"export/raw_taps.{now:%Y%m%d_%H%M%S}.csv",
-            "CSV Files (*.csv);;All Files (*)",
+            FILE_FILTER,
         )
 
         if not file_path:
@@ -108,16 +166,10 @@ class TapTracksContainer(QGroupBox):
             QMessageBox.information(self, "Export Failed", "No file selected")
             return
 
-        if not file_path.endswith(".csv"):
+        if not is_supported(file_path):
             file_path += ".csv"
 
-        data = [
-            (key.name[4:], start_time, end_time)
-            for key, track in self._track_taps.items()
-            for start_time, end_time in track
-        ]
-
-        frame = pl.DataFrame(data, SCHEMA, orient="row")
-        frame.write_csv(file_path)
-        self.tap_csv_path = Path(file_path).resolve(strict=True)
+        write_taps(self._taps.to_frame(), file_path)
+        self.tap_path = Path(file_path).resolve(strict=True)
+        self._unexported = False
         self.tracks_exported.emit(file_path)
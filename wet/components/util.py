@@ -1,5 +1,5 @@
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QPushButton, QSpinBox
+from PySide6.QtWidgets import QDoubleSpinBox, QPushButton, QSpinBox
 
 
 def make_button(text: str, height: int = 23, width: int = 0) -> QPushButton:
@@ -16,3 +16,13 @@ def make_spinbox(minmax: tuple[int, int], height: int = 23) -> QSpinBox:
     spinbox.setRange(*minmax)
     spinbox.setFixedHeight(height)
     return spinbox
+
+
+def make_double_spinbox(
+    minmax: tuple[float, float], decimals: int = 2, height: int = 23
+) -> QDoubleSpinBox:
+    spinbox = QDoubleSpinBox()
+    spinbox.setRange(*minmax)
+    spinbox.setDecimals(decimals)
+    spinbox.setFixedHeight(height)
+    return spinbox
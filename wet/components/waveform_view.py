@@ -0,0 +1,160 @@
+from logging import getLogger
+from typing import TYPE_CHECKING, override
+
+from PySide6.QtCore import QLineF, QRect, Qt, Signal
+from PySide6.QtGui import (
+    QColor,
+    QMouseEvent,
+    QPainter,
+    QPaintEvent,
+    QPixmap,
+    QResizeEvent,
+)
+from PySide6.QtWidgets import QWidget
+
+from wet import workers
+from wet.util import CACHE_DIR
+from wet.waveform import PeakPyramid, compute_peaks, load_cached_peaks
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+_logger = getLogger("wwise-event-tapper")
+
+_CACHE_DIR = CACHE_DIR / "waveforms"
+_HEIGHT = 48
+_UNPLAYED_COLOR = QColor("#9e9e9e")
+_PLAYED_COLOR = QColor("#03a9f4")
+_PLAYHEAD_COLOR = QColor("#e74c3c")
+
+
+class WaveformView(QWidget):
+    """A song's waveform overview, shaded up to the playback position.
+
+    Peaks come from a cached pyramid when the song was seen before, and are
+    computed in a worker process otherwise. The waveform is drawn once per size
+    into pixmaps; position changes only repaint the columns they touch.
+    """
+
+    seek_requested = Signal(int)  # position, in ms
+    # Relays computed peaks, (song path, future), from the executor.
+    _peaks_computed = Signal(str, object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setFixedHeight(_HEIGHT)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self._path = ""
+        self._pyramid: PeakPyramid | None = None
+        self._position = 0.0
+        self._unplayed = QPixmap()
+        self._played = QPixmap()
+        self._peaks_computed.connect(self._on_peaks_computed)
+
+    def load(self, path: str) -> None:
+        """Show a song's waveform, at once if its peaks are cached."""
+        self._path = path
+        self._position = 0.0
+        try:
+            pyramid = load_cached_peaks(path, _CACHE_DIR)
+        except OSError:
+            _logger.exception("Failed to read %s", path)
+            pyramid = None
+        self._set_pyramid(pyramid)
+        if pyramid is None:
+            future = workers.submit(compute_peaks, path, _CACHE_DIR)
+            # Runs in an executor thread, so relay through a queued signal.
+            future.add_done_callback(lambda done: self._peaks_computed.emit(path, done))
+
+    def set_position(self, position: float) -> None:
+        """Move the playhead, repainting only the columns between both positions."""
+        old_x, self._position = self._x_of(self._position), position
+        new_x = self._x_of(position)
+        if old_x != new_x:
+            left, right = min(old_x, new_x), max(old_x, new_x)
+            self.update(QRect(left - 1, 0, right - left + 3, self.height()))
+
+    def _on_peaks_computed(self, path: str, future: "Future[PeakPyramid]") -> None:
+        if path != self._path or future.cancelled():
+            return
+        try:
+            self._set_pyramid(future.result())
+        except Exception:
+            _logger.exception("Failed to compute the waveform of %s", path)
+
+    def _set_pyramid(self, pyramid: PeakPyramid | None) -> None:
+        self._pyramid = pyramid
+        self._render()
+        self.update()
+
+    def _x_of(self, position: float) -> int:
+        if self._pyramid is None or not self._pyramid.duration_ms:
+            return 0
+        return round(position / self._pyramid.duration_ms * self.width())
+
+    def _render(self) -> None:
+        """Draw the waveform into a pixmap per shade, at the current size."""
+        width, height = self.width(), self.height()
+        if self._pyramid is None or width <= 0:
+            self._unplayed = self._played = QPixmap()
+            return
+        columns = self._pyramid.columns(width).astype(float)
+        middle = height / 2
+        # At least a pixel high, so silence still shows a line.
+        tops = middle - columns[:, 1] / 127 * middle
+        bottoms = middle - columns[:, 0] / 127 * middle + 1
+        lines = [
+            QLineF(x + 0.5, top, x + 0.5, bottom)
+            for x, (top, bottom) in enumerate(zip(tops, bottoms, strict=True))
+        ]
+        self._unplayed, self._played = QPixmap(width, height), QPixmap(width, height)
+        for pixmap, color in (
+            (self._unplayed, _UNPLAYED_COLOR),
+            (self._played, _PLAYED_COLOR),
+        ):
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setPen(color)
+            painter.drawLines(lines)
+            painter.end()
+
+    @override
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        self._render()
+        super().resizeEvent(event)
+
+    @override
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if self._unplayed.isNull():
+            return
+        dirty = event.rect()
+        playhead = self._x_of(self._position)
+        painter = QPainter(self)
+        played = dirty.intersected(QRect(0, 0, playhead, self.height()))
+        unplayed = dirty.intersected(
+            QRect(playhead, 0, self.width() - playhead, self.height())
+        )
+        if not played.isEmpty():
+            painter.drawPixmap(played, self._played, played)
+        if not unplayed.isEmpty():
+            painter.drawPixmap(unplayed, self._unplayed, unplayed)
+        if dirty.left() <= playhead <= dirty.right():
+            painter.setPen(_PLAYHEAD_COLOR)
+            painter.drawLine(playhead, 0, playhead, self.height())
+        painter.end()
+
+    @override
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        self._request_seek(event)
+
+    @override
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._request_seek(event)
+
+    def _request_seek(self, event: QMouseEvent) -> None:
+        if self._pyramid is None or self.width() <= 0:
+            return
+        fraction = min(max(event.position().x() / self.width(), 0.0), 1.0)
+        self.seek_requested.emit(round(fraction * self._pyramid.duration_ms))
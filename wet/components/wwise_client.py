@@ -1,16 +1,206 @@
+import socket
+import time
+from collections.abc import Callable, Generator, Sequence
+from contextlib import contextmanager
+from enum import Enum
 from logging import getLogger
+from threading import Condition, Event, Lock, Thread, local
 from typing import Any, cast
+from urllib.parse import urlsplit
 
-from waapi import WaapiClient  # type: ignore[import]
+import polars as pl
+from waapi import CannotConnectToWaapiException, WaapiClient  # type: ignore[import]
+
+from wet import metrics
+from wet.util import ProgressCallback
 
 _logger = getLogger("wwise-event-tapper")
-_instances: list[WaapiClient] = []
 
+# Cues per `object.set` request. Large enough to amortize the round trip, small
+# enough that a rejected batch is cheap to retry cue by cue.
+_CUE_BATCH_SIZE = 500
+
+_WAAPI_URL = "ws://127.0.0.1:8080/waapi"
+
+# Reconnection delays in seconds, doubling from the first to the last.
+_RECONNECT_DELAY_RANGE = 0.5, 30.0
+_HEALTH_CHECK_INTERVAL = 1.0
+
+
+class ConnectionState(Enum):
+    DISCONNECTED = "Disconnected"
+    CONNECTING = "Connecting"
+    CONNECTED = "Connected"
+
+
+class _WaapiConnection:
+    """A WAAPI client shared by all controllers.
+
+    The client connects in a background thread on first use, and reconnects with
+    backoff whenever the connection drops. Calls are serialized since a session
+    serves one request at a time.
+    """
+
+    def __init__(self, url: str = _WAAPI_URL) -> None:
+        self.url = url
+        self._client: WaapiClient | None = None
+        self._state = ConnectionState.DISCONNECTED
+        self._listeners: list[Callable[[ConnectionState], None]] = []
+        self._thread: Thread | None = None
+        self._thread_lock = Lock()
+        self._call_lock = Lock()
+        self._state_changed = Condition()
+        self._stopping = Event()
+        self._redirected = Event()
+
+    @property
+    def state(self) -> ConnectionState:
+        return self._state
+
+    def add_state_listener(self, listener: Callable[[ConnectionState], None]) -> None:
+        """Listen to state changes. Listeners are called from a background thread."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """Start connecting in the background, unless already started."""
+        with self._thread_lock:
+            if self._thread is None and not self._stopping.is_set():
+                # Calls made right away wait for the first attempt.
+                self._set_state(ConnectionState.CONNECTING)
+                self._thread = Thread(target=self._run, name="waapi", daemon=True)
+                self._thread.start()
+
+    def call(self, timeout: float, uri: str, *args: Any, **kwargs: Any) -> Any:
+        """Call a WAAPI procedure. Returns None on failure or when disconnected.
+
+        While connecting, waits up to `timeout` seconds for the connection.
+        """
+        if (client := self._wait_for_client(timeout, uri)) is None:
+            return None
+        with self._call_lock:
+            return client.call(uri, *args, **kwargs)  # type: ignore
+
+    def subscribe(
+        self, timeout: float, uri: str, callback: Callable[..., None], **options: Any
+    ) -> bool:
+        """Subscribe to a WAAPI topic until the connection drops.
+
+        The callback receives the event as keyword arguments, in another thread.
+        """
+        if (client := self._wait_for_client(timeout, uri)) is None:
+            return False
+        with self._call_lock:
+            return client.subscribe(uri, callback, **options) is not None  # type: ignore
+
+    def _wait_for_client(self, timeout: float, uri: str) -> WaapiClient | None:
+        self.start()
+        with self._state_changed:
+            self._state_changed.wait_for(
+                lambda: self._state is not ConnectionState.CONNECTING, timeout
+            )
+        if (client := self._client) is None or not client.is_connected():  # type: ignore
+            _logger.warning("Wwise is not connected, skipped %s", uri)
+            return None
+        return client
+
+    def redirect(self, url: str) -> None:
+        """Connect to another server, dropping the current connection if any."""
+        self.url = url
+        if self._client is not None:
+            # Calls made meanwhile wait for the new connection.
+            self._set_state(ConnectionState.CONNECTING)
+            self._redirected.set()
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        if (client := self._client) is not None:
+            client.disconnect()  # type: ignore
+
+    def _set_state(self, state: ConnectionState) -> None:
+        with self._state_changed:
+            self._state = state
+            self._state_changed.notify_all()
+        for listener in self._listeners:
+            listener(state)
+
+    def _run(self) -> None:
+        delay = _RECONNECT_DELAY_RANGE[0]
+        while not self._stopping.is_set():
+            self._set_state(ConnectionState.CONNECTING)
+            if (client := self._try_connect()) is None:
+                _logger.info("Wwise is unreachable, retrying in %.1f s", delay)
+                self._set_state(ConnectionState.DISCONNECTED)
+                self._stopping.wait(delay)
+                delay = min(delay * 2, _RECONNECT_DELAY_RANGE[1])
+                continue
+
+            delay = _RECONNECT_DELAY_RANGE[0]
+            self._client = client
+            self._set_state(ConnectionState.CONNECTED)
+
+            while client.is_connected() and not self._stopping.is_set():  # type: ignore
+                if self._redirected.wait(_HEALTH_CHECK_INTERVAL):
+                    break
+
+            self._client = None
+            if self._redirected.is_set():
+                self._redirected.clear()
+                with self._call_lock:
+                    client.disconnect()  # type: ignore
+                continue
+            self._set_state(ConnectionState.DISCONNECTED)
+            if not self._stopping.is_set():
+                _logger.warning("Lost connection to Wwise, reconnecting")
+
+    def _try_connect(self) -> WaapiClient | None:
+        # Probe the port first: the client spends a thread and an event loop on
+        # every attempt, and may report a refused connection as joined.
+        url = urlsplit(self.url)
+        try:
+            with socket.create_connection((url.hostname, url.port), timeout=1.0):
+                pass
+            client = WaapiClient(self.url)
+        except (OSError, CannotConnectToWaapiException):
+            return None
+        return client if client.is_connected() else None  # type: ignore
+
+
+_connection = _WaapiConnection()
 
-class WwiseController(WaapiClient):
-    def __init__(self) -> None:
-        super().__init__()  # type: ignore
-        _instances.append(self)
+
+class WwiseController:
+    """Controls Wwise through the shared connection.
+
+    Calls made while connecting wait up to `timeout` seconds for the connection.
+    """
+
+    def __init__(self, timeout: float = 3.0) -> None:
+        self._timeout = timeout
+        # Undo groups open on each thread; nested groups join the outermost one.
+        self._undo_groups = local()
+
+    @property
+    def state(self) -> ConnectionState:
+        return _connection.state
+
+    def add_state_listener(self, listener: Callable[[ConnectionState], None]) -> None:
+        """Listen to connection changes. Listeners are called from another thread."""
+        _connection.add_state_listener(listener)
+
+    def connect(self) -> None:
+        """Start connecting in the background without waiting."""
+        _connection.start()
+
+    def call(self, uri: str, *args: Any, **kwargs: Any) -> Any:
+        """Call a procedure, timing it including any wait for the connection."""
+        with metrics.WAAPI_CALLS.timed(uri):
+            return _connection.call(self._timeout, uri, *args, **kwargs)
+
+    def subscribe(
+        self, uri: str, callback: Callable[..., None], **options: Any
+    ) -> bool:
+        """Subscribe to a topic. Subscriptions are lost when the connection drops."""
+        return _connection.subscribe(self._timeout, uri, callback, **options)
 
     def get_music_segments(self) -> list[dict[str, Any]]:
         """Get all music segments from Wwise."""
@@ -39,37 +229,157 @@ class WwiseController(WaapiClient):
         result = self.call("ak.wwise.core.object.create", args)  # type: ignore
         return result is not None
 
+    def create_cues(
+        self,
+        segment_id: str,
+        cues: pl.DataFrame,
+        cue_type: int = 2,
+        progress: ProgressCallback | None = None,
+    ) -> list[bool]:
+        """Create cues from a frame with `name` and `time_ms` columns.
+
+        Cues are sent in batches, one `object.set` request each. A rejected batch
+        falls back to `create_cue` per row, so the result still tells which cues
+        made it. Returns one success flag per row, in frame order.
+        """
+        created: list[bool] = []
+        for batch in cues.select("name", "time_ms").iter_slices(_CUE_BATCH_SIZE):
+            rows = batch.rows()
+            children = [
+                {
+                    "type": "MusicCue",
+                    "name": name,
+                    "@TimeMs": time_ms,
+                    "@CueType": cue_type,
+                }
+                for name, time_ms in rows
+            ]
+            args = {
+                "objects": [{"object": segment_id, "@Cues": children}],
+                "listMode": "append",
+            }
+            if self.call("ak.wwise.core.object.set", args) is not None:  # type: ignore
+                created.extend([True] * len(rows))
+            else:
+                _logger.warning(
+                    "Batch of %d cues rejected, retrying one by one", len(rows)
+                )
+                created.extend(
+                    self.create_cue(name, segment_id, time_ms, cue_type)
+                    for name, time_ms in rows
+                )
+            if progress:
+                progress(len(created), len(cues))
+        return created
+
+    def get_custom_cues(self, segment_id: str) -> pl.DataFrame:
+        """Get custom cues of a segment as a frame of `id`, `name` and `time_ms`."""
+        args = {
+            "waql": f'from object "{segment_id}" select descendants'
+            ' where type = "MusicCue" and CueType > 1'
+        }
+        opts = {"return": ["id", "name", "@TimeMs"]}
+
+        schema = pl.Schema({"id": str, "name": str, "time_ms": int})
+        result = cast("Any", self.call("ak.wwise.core.object.get", args, options=opts))  # type: ignore
+        cues = cast("list[dict[str, Any]]", (result or {}).get("return", []))  # type: ignore
+        rows = [(cue["id"], cue["name"], round(cue["@TimeMs"])) for cue in cues]
+        return pl.DataFrame(rows, schema, orient="row")
+
+    def set_cue_times(
+        self, cues: pl.DataFrame, progress: ProgressCallback | None = None
+    ) -> int:
+        """Move cues given a frame of `id` and `time_ms`. Returns count moved."""
+        moved_count = 0
+        for index, batch in enumerate(
+            cues.select("id", "time_ms").iter_slices(_CUE_BATCH_SIZE)
+        ):
+            objects = [
+                {"object": cue_id, "@TimeMs": time_ms}
+                for cue_id, time_ms in batch.rows()
+            ]
+            if self.call("ak.wwise.core.object.set", {"objects": objects}) is not None:  # type: ignore
+                moved_count += len(objects)
+            else:
+                _logger.warning("Failed to move a batch of %d cues", len(objects))
+            if progress:
+                progress(min((index + 1) * _CUE_BATCH_SIZE, len(cues)), len(cues))
+        return moved_count
+
     def save_project(self) -> None:
         self.call("ak.wwise.core.project.save", {})  # type: ignore
 
-    def clear_custom_cues(self, segment_id: str) -> int:
-        """Clear custom cues (CueType > 1) from segment. Returns count deleted."""
+    @contextmanager
+    def undo_group(self, name: str) -> Generator[None]:
+        """Group every change made inside the block into a single Wwise undo step.
+
+        Inside another group of the same thread, changes join that group instead.
+        """
+        depth: int = getattr(self._undo_groups, "depth", 0)
+        if depth == 0:
+            self.call("ak.wwise.core.undo.beginGroup", {})  # type: ignore
+        self._undo_groups.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._undo_groups.depth = depth
+            if depth == 0:
+                self.call("ak.wwise.core.undo.endGroup", {"displayName": name})  # type: ignore
+
+    def delete_objects(
+        self, object_ids: Sequence[str], progress: ProgressCallback | None = None
+    ) -> int:
+        """Delete objects, one call each, in one undo group. Returns count deleted."""
+        if not object_ids:
+            return 0
+
         deleted_count = 0
+        start = time.perf_counter()
+        with self.undo_group("Delete Objects"):
+            for index, object_id in enumerate(object_ids):
+                args = {"object": object_id}
+                if self.call("ak.wwise.core.object.delete", args) is not None:  # type: ignore
+                    deleted_count += 1
+                if progress:
+                    progress(index + 1, len(object_ids))
+        _logger.info(
+            "Deleted %d/%d objects in %.1f ms",
+            deleted_count,
+            len(object_ids),
+            (time.perf_counter() - start) * 1000,
+        )
+        return deleted_count
+
+    def clear_custom_cues(
+        self, segment_id: str, progress: ProgressCallback | None = None
+    ) -> int:
+        """Clear custom cues (CueType > 1) from segment. Returns count deleted."""
+        start = time.perf_counter()
 
         args = {
-            "waql": f'from object "{segment_id}" select descendants where type = "MusicCue"'  # noqa: E501
+            "waql": f'from object "{segment_id}" select descendants'
+            ' where type = "MusicCue" and CueType > 1'
         }
-        opts = {"return": ["id", "name", "CueType"]}
+        opts = {"return": ["id"]}
 
         result = cast("Any", self.call("ak.wwise.core.object.get", args, options=opts))  # type: ignore
-        cues = cast("Any", result.get("return", []))  # type: ignore
+        cues = cast("list[dict[str, str]]", (result or {}).get("return", []))  # type: ignore
         if not cues:
             return 0
 
-        _logger.info("Cues: %s", cues)
+        deleted_count = self.delete_objects([cue["id"] for cue in cues], progress)
+        _logger.info(
+            "Cleared %d custom cues in %.1f ms",
+            deleted_count,
+            (time.perf_counter() - start) * 1000,
+        )
+        return deleted_count
 
-        for cue in cues:
-            cue_type = cue.get("CueType", 0)  # type: ignore[assignment]
-            cue_id = cue.get("id")  # type: ignore[assignment]
-            # Only delete custom cues
-            if isinstance(cue_type, int) and cue_type > 1 and cue_id:
-                delete_args = {"object": cue_id}  # type: ignore[dict-item]
-                self.call("ak.wwise.core.object.delete", delete_args)  # type: ignore
-                deleted_count += 1
 
-        return deleted_count
+def configure_connection(url: str) -> None:
+    """Point the shared connection to another WAAPI server."""
+    _connection.redirect(url)
 
 
-def shutdown_instances() -> None:
-    for instance in _instances:
-        instance.disconnect()
+def shutdown_connection() -> None:
+    _connection.shutdown()
@@ -0,0 +1,235 @@
+import os
+import struct
+import sys
+import time
+from logging import getLogger
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from threading import Event, Thread
+from typing import BinaryIO
+
+import numpy as np
+import orjson
+import polars as pl
+
+_logger = getLogger("wwise-event-tapper")
+
+_MAGIC = b"WETJ\x01"
+# Header: magic, then the length and JSON of {"tracks": [...]}.
+_HEADER_LENGTH = struct.Struct("<I")
+# Record: event kind, track index, timestamp in ms.
+_RECORD = struct.Struct("<BBd")
+_RECORD_DTYPE = np.dtype([("kind", "u1"), ("track", "u1"), ("ms", "<f8")])
+_PRESS, _LIFT = 0, 1
+
+_FSYNC_INTERVAL = 0.2  # s
+
+SUFFIX = ".wetj"
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(file: BinaryIO) -> bool:
+        """Lock a journal for this process, until it closes the file."""
+        try:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+else:
+    import fcntl
+
+    def _try_lock(file: BinaryIO) -> bool:
+        """Lock a journal for this process, until it closes the file."""
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+
+class TapJournal:
+    """An append-only journal of tap presses and lifts, for crash recovery.
+
+    Appending only queues a packed record; a writer thread writes them in batches,
+    and syncs to disk at most `_FSYNC_INTERVAL` after the first unsynced batch. The
+    journal stays locked while open, so that other instances don't recover it.
+    """
+
+    def __init__(self, path: Path, tracks: list[str]) -> None:
+        self.path = path
+        self._track_indices = {track: i for i, track in enumerate(tracks)}
+        self._queue: SimpleQueue[bytes | Event | None] = SimpleQueue()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("wb", buffering=0)
+        if not _try_lock(self._file):
+            _logger.warning("Failed to lock the tap journal %s", path)
+        header = orjson.dumps({"tracks": tracks})
+        self._file.write(_MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        self._thread = Thread(target=self._run, name="tap-journal", daemon=True)
+        self._thread.start()
+
+    def press(self, track: str, timestamp: float) -> None:
+        self._queue.put(_RECORD.pack(_PRESS, self._track_indices[track], timestamp))
+
+    def lift(self, track: str, timestamp: float) -> None:
+        self._queue.put(_RECORD.pack(_LIFT, self._track_indices[track], timestamp))
+
+    def write_frame(self, frame: pl.DataFrame) -> None:
+        """Journal taps in the tap `SCHEMA`, as a press and a lift each."""
+        for track, start, end in frame.iter_rows():
+            self.press(track, start)
+            if end:
+                self.lift(track, end)
+
+    def sync(self) -> None:
+        """Wait until everything journaled so far is on disk."""
+        synced = Event()
+        self._queue.put(synced)
+        synced.wait()
+
+    def close(self, delete: bool = False) -> None:
+        """Write out pending records, then optionally delete the journal."""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if delete:
+            self.path.unlink(missing_ok=True)
+
+    def _run(self) -> None:
+        # When to sync the batches written since the last sync, if any. It holds
+        # however fast taps keep coming.
+        deadline: float | None = None
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                os.fsync(self._file.fileno())
+                deadline = None
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                record = self._queue.get(timeout=timeout)
+            except Empty:
+                continue
+
+            if isinstance(record, bytes):
+                record = self._write_batch(record)
+                if deadline is None:
+                    deadline = time.monotonic() + _FSYNC_INTERVAL
+            if record is None or isinstance(record, Event):
+                os.fsync(self._file.fileno())
+                deadline = None
+                if record is None:
+                    return
+                record.set()
+
+    def _write_batch(self, first: bytes) -> bytes | Event | None:
+        """Write the records queued so far.
+
+        Returns the control record that ended the batch, or b"" if the queue ran out.
+        """
+        batch = [first]
+        record: bytes | Event | None
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except Empty:
+                record = b""
+                break
+            if not isinstance(record, bytes):
+                break
+            batch.append(record)
+        self._file.write(b"".join(batch))
+        return record
+
+
+def replay(path: Path) -> pl.DataFrame:
+    """Read a journal into the tap `SCHEMA`. A torn last record is ignored.
+
+    Each lift ends the latest press of its track before it.
+    """
+    return _parse(path.read_bytes(), path)
+
+
+def _parse(data: bytes, path: Path) -> pl.DataFrame:
+    if not data.startswith(_MAGIC):
+        msg = f"Not a tap journal: {path}"
+        raise ValueError(msg)
+    offset = len(_MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, len(_MAGIC))
+    tracks: list[str] = orjson.loads(data[offset : offset + header_length])["tracks"]
+    offset += header_length
+
+    count = (len(data) - offset) // _RECORD.size
+    records = np.frombuffer(data, _RECORD_DTYPE, count, offset)
+    events = pl.from_numpy(records).with_row_index("seq")
+    presses = events.filter(kind=_PRESS).select("seq", "track", start="ms")
+    lifts = (
+        events.filter(kind=_LIFT)
+        .select("seq", "track", end="ms")
+        .join_asof(
+            presses.select("seq", "track", press_seq="seq"),
+            on="seq",
+            by="track",
+            strategy="backward",
+            check_sortedness=False,  # Sorted by construction.
+        )
+        .group_by("press_seq")
+        .agg(pl.col("end").last())
+    )
+    return (
+        presses.join(lifts, left_on="seq", right_on="press_seq", how="left")
+        .sort("seq")
+        .select(
+            pl.col("track").replace_strict(
+                dict(enumerate(tracks)), return_dtype=pl.String
+            ),
+            "start",
+            pl.col("end").fill_null(0.0),
+        )
+    )
+
+
+class RecoveredJournals:
+    """Journals left in a directory by a crash, replayed oldest first.
+
+    Journals locked by a running instance are skipped. The others stay locked
+    until `delete`, to call once their taps are safe elsewhere.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._files: list[tuple[Path, BinaryIO]] = []
+        frames: list[pl.DataFrame] = []
+        paths = sorted(directory.glob(f"*{SUFFIX}"), key=lambda p: p.stat().st_mtime)
+        for path in paths:
+            try:
+                file = path.open("rb")
+            except OSError:
+                _logger.exception("Failed to open the tap journal %s", path)
+                continue
+            if not _try_lock(file):
+                file.close()
+                continue
+            try:
+                file.seek(0)
+                frames.append(_parse(file.read(), path))
+            except (OSError, ValueError):
+                _logger.exception("Failed to replay the tap journal %s", path)
+                file.close()
+                continue
+            self._files.append((path, file))
+
+        frame = pl.concat(frames) if frames else None
+        # None when there are no taps to recover.
+        self.taps = frame if frame is not None and not frame.is_empty() else None
+
+    def delete(self) -> None:
+        for path, file in self._files:
+            file.close()
+            path.unlink(missing_ok=True)
+        self._files.clear()
+
+
+def new_journal_path(directory: Path) -> Path:
+    return directory / f"taps.{time.strftime('%Y%m%d_%H%M%S')}.{os.getpid()}{SUFFIX}"
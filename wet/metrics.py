@@ -0,0 +1,164 @@
+"""Always-on timings of taps and WAAPI calls, cheap enough for production sessions.
+
+`snapshot` gathers them, and `dump` writes them as JSON for `--metrics`.
+"""
+
+import time
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import orjson
+
+# Upper bounds of the latency buckets, from 1/8 ms to about a minute.
+_BUCKET_EDGES_MS = tuple(2.0**i for i in range(-3, 17))
+_TAP_CAPACITY = 4096
+
+
+class TapTiming(NamedTuple):
+    """When a tap happened, and when and how fast it was handled.
+
+    Instants are in `time.perf_counter_ns()`; positions are in playback ms.
+    """
+
+    track: str
+    is_lift: bool
+    event_ns: int
+    handler_ns: int
+    done_ns: int
+    position_ms: float
+    handler_position_ms: float
+
+
+class TapTimings:
+    """A ring buffer of the latest tap timings. Records from the GUI thread only."""
+
+    def __init__(self, capacity: int = _TAP_CAPACITY) -> None:
+        self._timings: deque[TapTiming] = deque(maxlen=capacity)
+
+    def record(self, timing: TapTiming) -> None:
+        self._timings.append(timing)
+
+    def summary(self) -> dict[str, Any]:
+        """Percentiles of the dispatch delay, handling time and clock skew.
+
+        The dispatch delay runs from the key event to the handler; the clock skew is
+        how far the player position moved over that delay, beyond the delay itself.
+        """
+        if not self._timings:
+            return {"count": 0}
+        rows = np.array(
+            [
+                (
+                    t.event_ns,
+                    t.handler_ns,
+                    t.done_ns,
+                    t.position_ms,
+                    t.handler_position_ms,
+                )
+                for t in self._timings
+            ],
+            dtype=np.float64,
+        )
+        event_ns, handler_ns, done_ns, position_ms, handler_position_ms = rows.T
+        dispatch_ms = (handler_ns - event_ns) / 1e6
+        return {
+            "count": len(rows),
+            "dispatch_ms": _percentiles(dispatch_ms),
+            "handling_us": _percentiles((done_ns - handler_ns) / 1e3),
+            "clock_skew_ms": _percentiles(
+                handler_position_ms - position_ms - dispatch_ms
+            ),
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "summary": self.summary(),
+            "recent": [timing._asdict() for timing in self._timings],
+        }
+
+
+def _percentiles(values: npt.NDArray[np.float64]) -> dict[str, float]:
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"p50": float(p50), "p99": float(p99), "max": float(values.max())}
+
+
+@dataclass(slots=True)
+class _Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(_BUCKET_EDGES_MS) + 1))
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(_BUCKET_EDGES_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile_ms(self, q: float) -> float:
+        """The upper bound of the bucket holding the `q` quantile."""
+        rank = q * sum(self.counts)
+        seen = 0
+        for edge, count in zip(_BUCKET_EDGES_MS, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(edge, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        count = sum(self.counts)
+        labels = [f"<={edge:g}" for edge in _BUCKET_EDGES_MS] + ["more"]
+        return {
+            "count": count,
+            "mean_ms": self.total_ms / count if count else 0.0,
+            "p50_ms": self.quantile_ms(0.5),
+            "p99_ms": self.quantile_ms(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {
+                label: n for label, n in zip(labels, self.counts, strict=True) if n
+            },
+        }
+
+
+class CallLatencies:
+    """Latency histograms by name, on log-spaced buckets. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, _Histogram] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def timed(self, name: str) -> Generator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter_ns() - start) / 1e6)
+
+    def add(self, name: str, ms: float) -> None:
+        with self._lock:
+            if (histogram := self._histograms.get(name)) is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.add(ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+
+TAPS = TapTimings()
+WAAPI_CALLS = CallLatencies()
+
+
+def snapshot() -> dict[str, Any]:
+    return {"taps": TAPS.snapshot(), "waapi_calls": WAAPI_CALLS.snapshot()}
+
+
+def dump(path: Path) -> None:
+    path.write_bytes(orjson.dumps(snapshot(), option=orjson.OPT_INDENT_2))
@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from wet.audio import decode_mono
+from wet.util import file_key
+
+_logger = getLogger("wwise-event-tapper")
+
+# Bump when the analysis changes, so stale cache entries are ignored.
+_VERSION = 1
+
+_FRAME_MS = 23.0  # Rounded to a power of two of samples.
+_HOP_MS = 5.0
+# Frames per FFT batch, bounding the frame matrix to a few tens of MB.
+_BATCH_FRAMES = 8192
+# Onsets peak within this many frames either way, and top the mean strength
+# within the wider radius by the delta.
+_PEAK_RADIUS = 6
+_MEAN_RADIUS = 20
+_PEAK_DELTA = 0.07
+
+
+@dataclass(frozen=True, slots=True)
+class OnsetEnvelope:
+    """Onset strength of a song per hop, and the onset times picked from it."""
+
+    hop_ms: float
+    strength: npt.NDArray[np.float32]  # Normalized; ~1 for strong onsets.
+    onsets_ms: npt.NDArray[np.float64]
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as file:
+            np.savez(
+                file,
+                hop_ms=self.hop_ms,
+                strength=self.strength,
+                onsets_ms=self.onsets_ms,
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "OnsetEnvelope":
+        with np.load(path) as data:
+            return cls(
+                float(data["hop_ms"]),
+                data["strength"].astype(np.float32),
+                data["onsets_ms"].astype(np.float64),
+            )
+
+
+def analyze(path: str | Path) -> OnsetEnvelope:
+    """Decode a song and compute its onset envelope by spectral flux.
+
+    Frames are centered on their hop, so frame `i` stands for `i * hop_ms`.
+    """
+    samples, rate = decode_mono(path)
+    hop = max(round(rate * _HOP_MS / 1000), 1)
+    hop_ms = hop * 1000 / rate
+    size = 1 << round(np.log2(rate * _FRAME_MS / 1000))
+
+    # Mirror the head, so the first frame does not rise from silence.
+    head = min(size // 2, len(samples) - 1)
+    padded = np.pad(samples, (head, 0), mode="reflect")
+    padded = np.pad(padded, (size // 2 - head, size))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, size)[::hop]
+    frames = frames[: len(samples) // hop + 1]
+    window = np.hanning(size).astype(np.float32)
+
+    # Flux is the summed rise of log magnitudes from the previous frame, so each
+    # batch overlaps the previous one by a frame.
+    flux = np.zeros(len(frames), dtype=np.float32)
+    previous: npt.NDArray[np.float32] | None = None
+    for start in range(0, len(frames), _BATCH_FRAMES):
+        spectra = np.abs(np.fft.rfft(frames[start : start + _BATCH_FRAMES] * window))
+        magnitudes = np.log1p(100 * spectra).astype(np.float32)
+        if previous is None:
+            previous = magnitudes[:1]
+        rises = np.diff(np.concatenate((previous, magnitudes)), axis=0)
+        flux[start : start + len(magnitudes)] = np.maximum(rises, 0).sum(axis=1)
+        previous = magnitudes[-1:]
+
+    strength = flux / max(float(np.percentile(flux, 99)), 1e-9)
+    return OnsetEnvelope(hop_ms, strength, _pick_onsets(strength) * hop_ms)
+
+
+def _pick_onsets(strength: npt.NDArray[np.float32]) -> npt.NDArray[np.float64]:
+    """Frames that peak locally and stand out from the mean around them."""
+
+    def around(radius: int) -> npt.NDArray[np.float32]:
+        padded = np.pad(strength, radius, mode="reflect")
+        return np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1)
+
+    is_peak = (strength >= around(_PEAK_RADIUS).max(axis=1)) & (
+        strength >= around(_MEAN_RADIUS).mean(axis=1) + _PEAK_DELTA
+    )
+    return np.flatnonzero(is_peak).astype(np.float64)
+
+
+def load_onsets(path: str | Path, cache_dir: Path) -> OnsetEnvelope:
+    """Analyze a song, or load its analysis cached by path, size and mtime."""
+    cache_path = cache_dir / f"{file_key(path)}.v{_VERSION}.npz"
+    try:
+        return OnsetEnvelope.load(cache_path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError):
+        _logger.warning("Ignoring a broken onset cache at %s", cache_path)
+
+    envelope = analyze(path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        envelope.save(cache_path)
+    except OSError:
+        _logger.exception("Failed to cache onsets at %s", cache_path)
+    return envelope
+
+
+def estimate_tap_shift(
+    starts: npt.NDArray[np.float64],
+    envelope: OnsetEnvelope,
+    max_shift_ms: float = 300.0,
+) -> float:
+    """Estimate how late taps land after the onsets, in ms, by cross-correlation.
+
+    The taps and the onsets, binned by hop, are correlated over shifts of up to
+    `max_shift_ms` either way; the peak is interpolated between hops.
+    """
+    length = len(envelope.strength)
+
+    def binned(times: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        bins = np.rint(np.asarray(times, dtype=np.float64) / envelope.hop_ms)
+        bins = bins[(bins >= 0) & (bins < length)].astype(np.intp)
+        return np.bincount(bins, minlength=length).astype(np.float64)
+
+    taps = binned(starts)
+    if not taps.any():
+        msg = "No taps fall within the song"
+        raise ValueError(msg)
+    # The picked onsets are sharper than the strength, whose rise smears early.
+    onsets = binned(envelope.onsets_ms)
+
+    radius = max(int(max_shift_ms / envelope.hop_ms), 1)
+    size = 1 << int(np.ceil(np.log2(length + radius + 1)))
+    # correlation[k] = sum(taps[i + k] * onsets[i]), negative k wrapping around.
+    correlation = np.fft.irfft(
+        np.fft.rfft(taps, size) * np.conj(np.fft.rfft(onsets, size)), size
+    )
+    lags = np.concatenate((correlation[-radius:], correlation[: radius + 1]))
+    # Tap timing jitters over a few hops; smooth it out before picking the peak.
+    kernel = np.exp(-0.5 * (np.arange(-6, 7) / 2.0) ** 2)
+    lags = np.convolve(lags, kernel / kernel.sum(), mode="same")
+
+    best = int(np.argmax(lags))
+    fraction = 0.0
+    if 0 < best < len(lags) - 1:
+        left, middle, right = lags[best - 1 : best + 2]
+        curvature = left - 2 * middle + right
+        if curvature < 0:
+            fraction = 0.5 * (left - right) / curvature
+    return (best - radius + fraction) * envelope.hop_ms
+
+
+def snap_to_onsets(
+    times: npt.NDArray[np.float64],
+    onsets_ms: npt.NDArray[np.float64],
+    tolerance_ms: float,
+) -> npt.NDArray[np.float64]:
+    """Move each time to its nearest onset, if within the tolerance."""
+    times = np.asarray(times, dtype=np.float64)
+    if not len(onsets_ms) or tolerance_ms <= 0:
+        return times
+    right = np.clip(np.searchsorted(onsets_ms, times), 1, len(onsets_ms) - 1)
+    left = right - 1 if len(onsets_ms) > 1 else right
+    nearest = np.where(
+        np.abs(times - onsets_ms[left]) <= np.abs(onsets_ms[right] - times),
+        onsets_ms[left],
+        onsets_ms[right],
+    )
+    return np.where(np.abs(nearest - times) <= tolerance_ms, nearest, times)
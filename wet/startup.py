@@ -0,0 +1,45 @@
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Times startup: imports and construction by phase, and milestones.
+
+    Times are in ms since the profile was created, as early as possible in `main`.
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        # Kind, name, start and duration of each phase.
+        self._phases: list[tuple[str, str, float, float]] = []
+        self._milestones: list[tuple[str, float]] = []
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    @contextmanager
+    def phase(self, kind: str, name: str) -> Generator[None]:
+        """Time a block, e.g. of kind "import" or "build"."""
+        start = self._elapsed_ms()
+        try:
+            yield
+        finally:
+            self._phases.append((kind, name, start, self._elapsed_ms() - start))
+
+    def mark(self, milestone: str) -> None:
+        self._milestones.append((milestone, self._elapsed_ms()))
+
+    def report(self) -> str:
+        lines = [f"{'':8}{'phase':<32}{'at ms':>9}{'took ms':>9}"]
+        lines += [
+            f"{kind:<8}{name:<32}{start:>9.1f}{duration:>9.1f}"
+            for kind, name, start, duration in self._phases
+        ]
+        for kind in dict.fromkeys(kind for kind, *_ in self._phases):
+            total = sum(d for k, _, _, d in self._phases if k == kind)
+            lines.append(f"{'total':<8}{kind:<32}{'':>9}{total:>9.1f}")
+        lines += [
+            f"{'reached':<8}{name:<32}{at:>9.1f}" for name, at in self._milestones
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,63 @@
+import polars as pl
+
+from wet.tap_io import SCHEMA
+
+# Taps of different takes closer than this, in ms, are the same tap.
+DEFAULT_TOLERANCE_MS = 40
+
+
+def merge_takes(takes: list[pl.DataFrame], tolerance_ms: float) -> pl.DataFrame:
+    """Merge takes of the same song into consensus taps.
+
+    Taps are clustered per track by splitting the sorted starts wherever two are
+    more than `tolerance_ms` apart, so the tolerance should stay under half the
+    shortest interval between taps on a track. Each cluster becomes one tap at the
+    median start, and the median end of its lifted taps or 0 if none was lifted.
+
+    Returns the raw tap schema, plus `agreement`: how many takes tapped there.
+    """
+    taps = pl.concat(
+        [
+            take.select(
+                pl.col("track").cast(pl.Categorical),
+                "start",
+                "end",
+                take=pl.lit(i, pl.UInt32),
+            )
+            for i, take in enumerate(takes)
+        ]
+        or [pl.DataFrame((), SCHEMA)]
+    )
+    if taps.is_empty():
+        return taps.select(
+            pl.col("track").cast(pl.String),
+            "start",
+            "end",
+            agreement=pl.lit(0, pl.UInt32),
+        )
+
+    # Sort on one key that lays tracks out one after the other, further apart than
+    # the tolerance: cheaper than sorting by track then start, and the gaps between
+    # tracks split clusters like any other.
+    first, last = taps["start"].min(), taps["start"].max()
+    stride = float(last - first) + 2 * tolerance_ms + 1  # type: ignore[operator]
+    key = pl.col("track").to_physical() * stride + (pl.col("start") - first)
+    lifted_ends = pl.col("end").filter(pl.col("end") > 0)
+    return (
+        taps.sort(key)
+        .with_columns(
+            cluster=(key.diff() > tolerance_ms)
+            .fill_null(value=True)
+            .cum_sum()
+            .set_sorted()
+        )
+        .group_by("cluster", maintain_order=True)
+        .agg(
+            pl.col("track").first().cast(pl.String),
+            pl.col("start").median(),
+            lifted_ends.median().fill_null(0.0).alias("end"),
+            pl.col("take").n_unique().cast(pl.UInt32).alias("agreement"),
+        )
+        .drop("cluster")
+        .sort("start")
+    )
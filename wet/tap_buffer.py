@@ -0,0 +1,99 @@
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+_INITIAL_CAPACITY = 256
+
+
+class _TrackColumns:
+    """Start and end columns of one track, grown by doubling."""
+
+    __slots__ = ("count", "ends", "shared", "starts")
+
+    def __init__(self) -> None:
+        self.starts: npt.NDArray[np.float64] = np.zeros(_INITIAL_CAPACITY)
+        self.ends: npt.NDArray[np.float64] = np.zeros(_INITIAL_CAPACITY)
+        self.count = 0
+        # Whether an exported frame views the filled rows, which are then read-only.
+        self.shared = False
+
+    def press(self, timestamp: float) -> None:
+        if self.count == len(self.starts):
+            capacity = 2 * self.count
+            self.starts = np.resize(self.starts, capacity)
+            self.ends = np.resize(self.ends, capacity)
+            self.shared = False
+        self.starts[self.count] = timestamp
+        self.ends[self.count] = 0.0
+        self.count += 1
+
+    def extend(
+        self, starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64]
+    ) -> None:
+        count = self.count + len(starts)
+        if count > len(self.starts):
+            capacity = max(2 * len(self.starts), count)
+            self.starts = np.resize(self.starts, capacity)
+            self.ends = np.resize(self.ends, capacity)
+            self.shared = False
+        self.starts[self.count : count] = starts
+        self.ends[self.count : count] = ends
+        self.count = count
+
+    def lift(self, timestamp: float) -> None:
+        if not self.count:
+            return
+        if self.shared:
+            self.ends = self.ends.copy()
+            self.shared = False
+        self.ends[self.count - 1] = timestamp
+
+
+class TapBuffer:
+    """Taps of named tracks, in preallocated float64 columns of milliseconds.
+
+    A press appends a row whose end is 0 until lifted; a lift patches the end of
+    the track's last row in place. Exported frames view the columns without
+    copying, and the buffer copies a column before writing to an exported row.
+    """
+
+    def __init__(self, tracks: list[str]) -> None:
+        self._tracks = {track: _TrackColumns() for track in tracks}
+
+    @property
+    def tracks(self) -> list[str]:
+        return list(self._tracks)
+
+    def count(self, track: str) -> int:
+        return self._tracks[track].count
+
+    def press(self, track: str, timestamp: float) -> int:
+        """Add a tap. Returns the tap count of the track."""
+        columns = self._tracks[track]
+        columns.press(timestamp)
+        return columns.count
+
+    def lift(self, track: str, timestamp: float) -> None:
+        """End the last tap of a track."""
+        self._tracks[track].lift(timestamp)
+
+    def extend(self, frame: pl.DataFrame) -> None:
+        """Append taps in the tap `SCHEMA`. Taps of unknown tracks are skipped."""
+        for (track,), taps in frame.partition_by("track", as_dict=True).items():
+            if (columns := self._tracks.get(str(track))) is not None:
+                columns.extend(taps["start"].to_numpy(), taps["end"].to_numpy())
+
+    def to_frame(self) -> pl.DataFrame:
+        """Get all taps in the tap `SCHEMA`, track by track."""
+        frames: list[pl.DataFrame] = []
+        for track, columns in self._tracks.items():
+            columns.shared = True
+            frames.append(
+                pl.DataFrame(
+                    [
+                        pl.Series("start", columns.starts[: columns.count]),
+                        pl.Series("end", columns.ends[: columns.count]),
+                    ]
+                ).select(pl.lit(track).alias("track"), "start", "end")
+            )
+        return pl.concat(frames, rechunk=False)
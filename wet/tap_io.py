@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import polars as pl
+
+# Raw taps, one row per key press. The end is 0 until the key is lifted.
+SCHEMA = pl.Schema(
+    {
+        "track": str,
+        "start": float,  # ms
+        "end": float,  # ms
+    }
+)
+
+_CSV = (".csv",)
+_PARQUET = (".parquet",)
+_IPC = (".arrow", ".ipc", ".feather")
+
+FILE_FILTER = (
+    "Tap Files (*.csv *.parquet *.arrow *.ipc *.feather);;"
+    "CSV Files (*.csv);;"
+    "Parquet Files (*.parquet);;"
+    "Arrow IPC Files (*.arrow *.ipc *.feather);;"
+    "All Files (*)"
+)
+
+
+def is_supported(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in (*_CSV, *_PARQUET, *_IPC)
+
+
+def read_taps(path: str | Path, schema: pl.Schema) -> pl.DataFrame:
+    """Read taps by file extension. Arrow IPC files are memory-mapped.
+
+    Binary formats keep their own types; only the columns of `schema` are kept, cast
+    where they differ.
+    """
+    match Path(path).suffix.lower():
+        case suffix if suffix in _CSV:
+            return pl.read_csv(path, schema=schema)
+        case suffix if suffix in _PARQUET:
+            frame = pl.read_parquet(path, columns=schema.names())
+        case suffix if suffix in _IPC:
+            # Polars memory-maps local, uncompressed IPC files by itself.
+            frame = pl.read_ipc(path, columns=schema.names())
+        case suffix:
+            msg = f"Unsupported tap file type: {suffix or path}"
+            raise ValueError(msg)
+    return frame.cast(schema)
+
+
+def write_taps(frame: pl.DataFrame, path: str | Path) -> None:
+    """Write taps by file extension.
+
+    Arrow IPC files stay uncompressed so that they can be memory-mapped on load.
+    """
+    match Path(path).suffix.lower():
+        case suffix if suffix in _CSV:
+            frame.write_csv(path, float_precision=3)
+        case suffix if suffix in _PARQUET:
+            frame.write_parquet(path)
+        case suffix if suffix in _IPC:
+            frame.write_ipc(path, compression="uncompressed")
+        case suffix:
+            msg = f"Unsupported tap file type: {suffix or path}"
+            raise ValueError(msg)
@@ -0,0 +1,217 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+_DEFAULT_BEATS_PER_BAR = 4
+
+# Tempo estimation stops refining at this relative beat length step, or after so
+# many rounds.
+_FINEST_STEP = 1e-6
+_REFINE_ROUNDS = 40
+
+
+@dataclass(frozen=True, slots=True)
+class TempoChange:
+    time_ms: float
+    bpm: float
+    beats_per_bar: int = _DEFAULT_BEATS_PER_BAR
+
+
+class TempoMap:
+    """Tempo change points of a song, with the beat grid starting at the first one.
+
+    Beats and bars are numbered continuously across changes: a change starts on the
+    beat nearest to it under the previous tempo, and on a new bar.
+    """
+
+    def __init__(self, changes: list[TempoChange]) -> None:
+        if not changes:
+            msg = "A tempo map needs at least one tempo change"
+            raise ValueError(msg)
+        if any(change.bpm <= 0 or change.beats_per_bar <= 0 for change in changes):
+            msg = "Tempo changes need a positive BPM and beats per bar"
+            raise ValueError(msg)
+        self.changes = sorted(changes, key=lambda change: change.time_ms)
+        self._frame = self._build_frame()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TempoMap) and self.changes == other.changes
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.changes))
+
+    @classmethod
+    def constant(cls, bpm: float, offset_ms: float) -> "TempoMap":
+        return cls([TempoChange(offset_ms, bpm)])
+
+    @classmethod
+    def read_csv(cls, path: str | Path) -> "TempoMap":
+        """Read a CSV of `time_ms`, `bpm` and optionally `beats_per_bar`."""
+        frame = pl.read_csv(path)
+        if "beats_per_bar" not in frame.columns:
+            frame = frame.with_columns(beats_per_bar=_DEFAULT_BEATS_PER_BAR)
+        return cls(
+            [
+                TempoChange(float(time_ms), float(bpm), int(beats_per_bar))
+                for time_ms, bpm, beats_per_bar in frame.select(
+                    "time_ms", "bpm", "beats_per_bar"
+                ).iter_rows()
+            ]
+        )
+
+    def _build_frame(self) -> pl.DataFrame:
+        """Tabulate the changes with the beat and bar numbers they start on."""
+        changes = pl.DataFrame(
+            {
+                "anchor_ms": [change.time_ms for change in self.changes],
+                "beat_ms": [60000.0 / change.bpm for change in self.changes],
+                "beats_per_bar": [change.beats_per_bar for change in self.changes],
+            },
+            schema={
+                "anchor_ms": pl.Float64,
+                "beat_ms": pl.Float64,
+                "beats_per_bar": pl.Int64,
+            },
+        )
+        beats = (pl.col("anchor_ms").diff() / pl.col("beat_ms").shift()).round()
+        bars = (beats / pl.col("beats_per_bar").shift()).ceil()
+        return changes.with_columns(
+            beats.fill_null(0).cum_sum().cast(pl.Int64).alias("base_beat"),
+            bars.fill_null(0).cum_sum().cast(pl.Int64).alias("base_bar"),
+            # Taps before the first change follow its tempo backwards.
+            pl.when(pl.int_range(pl.len()) == 0)
+            .then(float("-inf"))
+            .otherwise(pl.col("anchor_ms"))
+            .alias("from_ms"),
+        )
+
+    def calibrate(self, taps: pl.LazyFrame, columns: tuple[str, ...]) -> pl.LazyFrame:
+        """Snap the tap time columns to the nearest beats.
+
+        For each column `c`, adds `c_sequence` (continuous beat number),
+        `c_calibrated` (beat time in ms, truncated to an integer) and `c_bar`.
+        The taps come out sorted by the first column.
+        """
+        grid = self._frame.lazy()
+        for column in columns:
+            taps = taps.sort(column).join_asof(
+                grid.select(pl.all().name.suffix(f"_{column}")),
+                left_on=column,
+                right_on=f"from_ms_{column}",
+                strategy="backward",
+            )
+
+        outputs: list[pl.Expr] = []
+        helpers: list[str] = []
+        for column in columns:
+
+            def grid_col(name: str, column: str = column) -> pl.Expr:
+                return pl.col(f"{name}_{column}")
+
+            offset = (pl.col(column) - grid_col("anchor_ms")) / grid_col("beat_ms")
+            local_beat = offset.round().cast(pl.Int64)
+            outputs += [
+                (grid_col("base_beat") + local_beat).alias(f"{column}_sequence"),
+                (local_beat * grid_col("beat_ms") + grid_col("anchor_ms"))
+                .cast(pl.Int64)
+                .alias(f"{column}_calibrated"),
+                (
+                    grid_col("base_bar")
+                    + local_beat.floordiv(grid_col("beats_per_bar"))
+                ).alias(f"{column}_bar"),
+            ]
+            helpers += [f"{name}_{column}" for name in self._frame.columns]
+        return taps.with_columns(outputs).drop(helpers).sort(columns[0])
+
+
+@dataclass(frozen=True, slots=True)
+class TempoEstimate:
+    bpm: float
+    offset_ms: float  # In [0, beat length).
+    confidence: float  # In [0, 1]; 1 when every tap is on a beat.
+
+
+def estimate_tempo(
+    starts: npt.NDArray[np.float64],
+    bpm_range: tuple[float, float] = (40.0, 300.0),
+    initial_taps: int = 512,
+) -> TempoEstimate:
+    """Estimate a constant tempo from tap times in ms.
+
+    Each candidate beat length maps the taps onto a circle by phase; the length
+    whose phases concentrate most (the longest mean resultant) wins.
+
+    The search runs coarse to fine: a full grid over the first `initial_taps` taps,
+    then a narrow grid around the pick each time the time window doubles. A longer
+    window tells beat lengths apart more finely, and needs fewer candidates.
+
+    Multiples of the tempo fit equally well, so the slowest tempo scoring close to
+    the best one is chosen.
+    """
+    times = np.sort(np.asarray(starts, dtype=np.float64))
+    times = times[np.isfinite(times)]
+    if len(times) < 2:
+        msg = "At least two taps are needed to estimate a tempo"
+        raise ValueError(msg)
+    origin = float(times[0])
+    times -= origin
+    span = max(float(times[-1]), 1.0)
+    min_beat, max_beat = 60000.0 / bpm_range[1], 60000.0 / bpm_range[0]
+
+    # Phases drift by a turn over a window when the beat length is off by
+    # beat / window, relatively, so the grid steps by a quarter of that.
+    first_taps = times[: min(initial_taps, len(times))]
+    window = min(max(float(first_taps[-1]), 8 * max_beat), span)
+    step = min_beat / window / 4
+    count = int(np.log(max_beat / min_beat) / np.log1p(step)) + 1
+    beats = min_beat * np.exp(np.arange(count) * np.log1p(step))
+    strengths = np.abs(_mean_resultants(times[times <= window], beats))
+    padded = np.pad(strengths, 1)
+    peaks = np.flatnonzero(
+        (strengths >= padded[:-2])
+        & (strengths >= padded[2:])
+        & (strengths >= 0.9 * strengths.max())
+    )
+    beat = float(beats[peaks.max()])
+
+    # Double the window up to the span, then keep narrowing over the span.
+    # Phases are taken around the middle of the window, where a slightly wrong beat
+    # length shifts them the least.
+    step = beat / window / 4
+    for _ in range(_REFINE_ROUNDS):
+        if window < span:
+            window = min(2 * window, span)
+            step = beat / window / 4
+        else:
+            step /= 4
+        beats = beat * np.linspace(1 - 8 * step, 1 + 8 * step, 17)
+        in_window = times[times <= window] - window / 2
+        beat = float(beats[np.argmax(np.abs(_mean_resultants(in_window, beats)))])
+        if window >= span and step < _FINEST_STEP:
+            break
+
+    middle = span / 2
+    (resultant,) = _mean_resultants(times - middle, np.array([beat]))
+    offset = float(np.angle(resultant)) % (2 * np.pi) / (2 * np.pi) * beat
+    return TempoEstimate(
+        bpm=60000.0 / beat,
+        offset_ms=(offset + origin + middle) % beat,
+        confidence=float(np.abs(resultant)),
+    )
+
+
+def _mean_resultants(
+    times: npt.NDArray[np.float64], beats: npt.NDArray[np.float64]
+) -> npt.NDArray[np.complex128]:
+    """Mean of the unit phasors of the times, for each beat length."""
+    # Bound the (beats x times) phase matrix to a few million cells.
+    chunk = max(4_000_000 // len(times), 1)
+    turns = 2j * np.pi * times[None, :]
+    parts = [
+        np.exp(turns / beats[i : i + chunk, None]).mean(axis=1)
+        for i in range(0, len(beats), chunk)
+    ]
+    return np.concatenate(parts).astype(np.complex128)
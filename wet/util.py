@@ -1,10 +1,18 @@
 import datetime as dt
+import hashlib
+from collections import OrderedDict
 from collections.abc import Callable
 from functools import wraps
 from pathlib import Path
 from threading import Lock
 
 REPO_ROOT = Path(__file__).parent.parent
+# Derived data, such as analyses of songs, safe to delete. Exports go elsewhere.
+CACHE_DIR = Path("cache")
+
+# (done, total) -> None. Long-running work calls it between steps; it may raise to
+# abort the work, e.g. when a background job is cancelled.
+type ProgressCallback = Callable[[int, int], None]
 
 
 def once[**P, R](fn: Callable[P, R]) -> Callable[P, R | None]:
@@ -24,5 +32,37 @@ def once[**P, R](fn: Callable[P, R]) -> Callable[P, R | None]:
     return wrapper
 
 
+class LruCache[K, V]:
+    """A mapping that keeps only its `maxsize` most recently used entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
 def now() -> dt.datetime:
     return dt.datetime.now().astimezone()
+
+
+def file_key(path: str | Path) -> str:
+    """Key a file by path, size and modification time, e.g. for caches of analyses.
+
+    Only stats the file, so it is cheap enough for the GUI thread.
+    """
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{resolved}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from wet.audio import decode_mono
+from wet.util import file_key
+
+_logger = getLogger("wwise-event-tapper")
+
+# Bump when the pyramid changes, so stale cache entries are ignored.
+_VERSION = 1
+
+# Samples per peak at the finest level; each coarser level halves the peaks.
+_BASE_BLOCK = 256
+# Stop coarsening at this many peaks, which suits any timeline width.
+_MIN_PEAKS = 256
+
+
+@dataclass(frozen=True, slots=True)
+class PeakPyramid:
+    """Min/max peaks of a song at halving resolutions, scaled to int8.
+
+    Level `i` holds a (min, max) row per `_BASE_BLOCK << i` samples.
+    """
+
+    sample_rate: int
+    samples: int
+    levels: list[npt.NDArray[np.int8]]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.samples * 1000 / self.sample_rate
+
+    @classmethod
+    def from_samples(
+        cls, samples: npt.NDArray[np.float32], sample_rate: int
+    ) -> "PeakPyramid":
+        blocks = -(-len(samples) // _BASE_BLOCK)
+        padded = np.zeros(blocks * _BASE_BLOCK, dtype=np.float32)
+        padded[: len(samples)] = samples
+        rows = padded.reshape(blocks, _BASE_BLOCK)
+        peaks = np.stack((rows.min(axis=1), rows.max(axis=1)), axis=1)
+        levels = [np.rint(np.clip(peaks, -1, 1) * 127).astype(np.int8)]
+        while len(levels[-1]) > _MIN_PEAKS:
+            level = levels[-1]
+            if len(level) % 2:
+                level = np.concatenate((level, np.zeros((1, 2), np.int8)))
+            pairs = level.reshape(-1, 2, 2)
+            levels.append(
+                np.stack((pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)), 1)
+            )
+        return cls(sample_rate, len(samples), levels)
+
+    def columns(self, width: int) -> npt.NDArray[np.int8]:
+        """Reduce to `width` (min, max) rows, from the finest level coarse enough."""
+        per_column = self.samples / max(width, 1)
+        index = int(np.clip(np.log2(max(per_column / _BASE_BLOCK, 1)), 0, None))
+        level = self.levels[min(index, len(self.levels) - 1)]
+        edges = (np.arange(width) * len(level)) // max(width, 1)
+        return np.stack(
+            (
+                np.minimum.reduceat(level[:, 0], edges),
+                np.maximum.reduceat(level[:, 1], edges),
+            ),
+            axis=1,
+        )
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as file:
+            # All levels in one array, split by their lengths on load.
+            np.savez(
+                file,
+                sample_rate=self.sample_rate,
+                samples=self.samples,
+                lengths=[len(level) for level in self.levels],
+                peaks=np.concatenate(self.levels),
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PeakPyramid":
+        with np.load(path) as data:
+            splits = np.cumsum(data["lengths"])[:-1]
+            return cls(
+                int(data["sample_rate"]),
+                int(data["samples"]),
+                np.split(data["peaks"].astype(np.int8), splits),
+            )
+
+
+def _cache_path(path: str | Path, cache_dir: Path) -> Path:
+    return cache_dir / f"{file_key(path)}.v{_VERSION}.npz"
+
+
+def load_cached_peaks(path: str | Path, cache_dir: Path) -> PeakPyramid | None:
+    """Load the peaks of a song seen before, or None."""
+    cache_path = _cache_path(path, cache_dir)
+    try:
+        return PeakPyramid.load(cache_path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError):
+        _logger.warning("Ignoring a broken waveform cache at %s", cache_path)
+        return None
+
+
+def compute_peaks(path: str | Path, cache_dir: Path) -> PeakPyramid:
+    """Decode a song into its peak pyramid, and cache it."""
+    pyramid = PeakPyramid.from_samples(*decode_mono(path))
+    cache_path = _cache_path(path, cache_dir)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        pyramid.save(cache_path)
+    except OSError:
+        _logger.exception("Failed to cache the waveform at %s", cache_path)
+    return pyramid
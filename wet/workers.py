@@ -0,0 +1,30 @@
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+
+# Song analyses run here, away from the GUI and the GIL.
+_MAX_WORKERS = 2
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+def submit[**P, R](fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> Future[R]:
+    """Run a picklable function in a worker process."""
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            # Forking a process running Qt threads is unsafe.
+            _executor = ProcessPoolExecutor(
+                max_workers=_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor.submit(fn, *args, **kwargs)
+
+
+def shutdown() -> None:
+    """Drop queued work, and wait for the running work to finish."""
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)